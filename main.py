@@ -1,105 +1,1776 @@
+import time
+_T0 = time.perf_counter()
 import sys
 import os
+import re
 import json
+import math
+import random
+import unicodedata
+import importlib
+import importlib.util
 import shutil
+import sqlite3
+import threading
+import queue
 import calendar
-from datetime import datetime, date
-from io import StringIO
-from contextlib import redirect_stdout
+import difflib
+import hashlib
+import heapq
+import bisect
+import uuid
+import mimetypes
+from html import escape as html_escape
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from collections import Counter, OrderedDict, namedtuple, deque
+from datetime import datetime, date, timedelta
+
+# --- PLAYGROUND WORKER ---
+PLAYGROUND_MEM_EXIT = 86   # exit code of a worker killed by the Windows memory watchdog
+
+def limit_memory(mb):
+    """Address-space limit on POSIX; on Windows a watchdog thread polls the commit charge."""
+    limit = mb * 1024 * 1024
+    try:
+        import resource
+        hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+        resource.setrlimit(resource.RLIMIT_AS, (limit if hard == resource.RLIM_INFINITY else min(limit, hard), hard))
+        return
+    except (ImportError, ValueError, OSError): pass
+    if os.name != "nt": return
+    import ctypes
+    from ctypes import wintypes
+    class Counters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [(n, ctypes.c_size_t) for n in (
+            "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+            "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+    kernel = ctypes.WinDLL("kernel32")
+    kernel.GetCurrentProcess.restype = wintypes.HANDLE
+    query = ctypes.WinDLL("psapi").GetProcessMemoryInfo
+    query.argtypes = [wintypes.HANDLE, ctypes.POINTER(Counters), wintypes.DWORD]
+    def watch():
+        c = Counters()
+        c.cb = ctypes.sizeof(c)
+        while True:
+            if query(kernel.GetCurrentProcess(), ctypes.byref(c), c.cb) and c.PagefileUsage > limit:
+                os._exit(PLAYGROUND_MEM_EXIT)
+            time.sleep(0.2)
+    threading.Thread(target=watch, name="memory-watchdog", daemon=True).start()
+
+def playground_worker(argv):
+    """Child process of the Python playground. Reads {"id", "code", "session", "line"} lines from stdin and
+    answers with {"id", "stream", "text"} chunks and a final {"id", "done", "ok", "error", "wall", "cpu"} line.
+    Session runs share one namespace until a {"reset": true} request; --preload modules are imported up front."""
+    import io, builtins, traceback, linecache
+    chan_in, chan_out = sys.stdin, sys.stdout
+    lock = threading.RLock()   # held across buffer swap + send so chunks can't overtake "done"
+    def send(msg):
+        with lock:
+            chan_out.write(json.dumps(msg) + "\n")
+            chan_out.flush()
+    if "--mem" in argv: limit_memory(int(argv[argv.index("--mem") + 1]))
+    if "--preload" in argv:
+        for name in filter(None, argv[argv.index("--preload") + 1].split(",")):
+            try: importlib.import_module(name)
+            except Exception: pass
+    
+    class Stream(io.TextIOBase):
+        """Buffers user output and ships it in chunks (every 4 KB or 50 ms) instead of per print()."""
+        def __init__(self, name):
+            self.name, self.rid, self._buf = name, None, []
+        def writable(self): return True
+        def write(self, text):
+            with lock: self._buf.append(text)
+            if sum(map(len, self._buf)) > 4096: self.flush()
+            return len(text)
+        def flush(self):
+            with lock:
+                text, self._buf = "".join(self._buf), []
+                if text: send({"id": self.rid, "stream": self.name, "text": text})
+    
+    streams = (Stream("out"), Stream("err"))
+    def pump():
+        while True:
+            time.sleep(0.05)
+            for st in streams: st.flush()
+    threading.Thread(target=pump, name="pump", daemon=True).start()
+    sys.stdout, sys.stderr, sys.stdin = streams[0], streams[1], io.StringIO()
+    send({"ready": True, "pid": os.getpid()})
+    fresh = lambda: {"__name__": "__main__", "__builtins__": builtins}
+    session = fresh()
+    
+    for line in chan_in:
+        try: req = json.loads(line)
+        except ValueError: continue
+        if req.get("reset"):
+            session = fresh()
+            continue
+        for st in streams: st.rid = req["id"]
+        ns = session if req.get("session") else fresh()
+        code = "\n" * req.get("line", 0) + req["code"]   # keep editor line numbers in tracebacks
+        error = None
+        wall, cpu = time.perf_counter(), time.process_time()
+        linecache.cache["<playground>"] = (len(code), None, code.splitlines(True), "<playground>")
+        try: exec(compile(code, "<playground>", "exec"), ns)
+        except SystemExit: pass
+        except BaseException as e:
+            error = "".join(traceback.format_exception(type(e), e, e.__traceback__.tb_next))
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        with lock:
+            for st in streams: st.flush()
+            send({"id": req["id"], "done": True, "ok": error is None, "error": error, "wall": wall, "cpu": cpu})
+    return 0
+
+if __name__ == "__main__" and "--playground-worker" in sys.argv:
+    sys.exit(playground_worker(sys.argv))
 
 # --- IMPORTY ---
-try:
-    import google.generativeai as genai
-    from bs4 import BeautifulSoup
-    HAS_AI = True
-except ImportError:
-    HAS_AI = False
+class LazyModule:
+    """Module proxy imported on first attribute access (grpc/protobuf stay out of startup)."""
+    def __init__(self, name):
+        self._name = name
+        self._mod = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._mod is None:
+            with self._lock:
+                if self._mod is None:
+                    t0 = time.perf_counter()
+                    self._mod = importlib.import_module(self._name)
+                    STATS[f"import_{self._name}_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        return self._mod
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+def has_module(name):
+    """Availability probe without importing the module itself (only its parent packages)."""
+    try: return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError): return False
+
+genai = LazyModule("google.generativeai")
+bs4 = LazyModule("bs4")
+HAS_AI = has_module("google.generativeai")
+HAS_BS4 = has_module("bs4")
+
+def prewarm_imports(api_key=None):
+    """Import the heavy optional modules on an idle background thread (and warm the AI client)."""
+    def run():
+        for mod, ok in ((bs4, HAS_BS4), (genai, HAS_AI)):
+            if ok:
+                try: mod.load()
+                except Exception: pass
+        client = ai_client()
+        if api_key and isinstance(client, GeminiBackend) and client.available:
+            try: client.model(api_key)
+            except Exception: pass
+    threading.Thread(target=run, name="prewarm", daemon=True).start()
 
 HAS_DATA = False 
 
-from PyQt5.QtCore import Qt, QUrl, QThread, pyqtSignal, QSize, QTimer, QDate, QPropertyAnimation, QEasingCurve, QRect, pyqtProperty
-from PyQt5.QtGui import QColor, QFont, QIcon, QPalette, QPainter, QLinearGradient
+from PyQt5.QtCore import (Qt, QObject, QUrl, QBuffer, QThread, pyqtSignal, QSize, QTimer, QDate, QPropertyAnimation, QEasingCurve, QRect, QRectF,
+                          pyqtProperty, QEvent, QModelIndex, QAbstractListModel, QSortFilterProxyModel, QFileSystemWatcher,
+                          QProcess, QPointF, QLockFile)
+from PyQt5.QtGui import (QColor, QCursor, QKeySequence, QFont, QIcon, QPalette, QPainter, QLinearGradient, QPen, QTextCursor,
+                         QStaticText, QTransform, QImage, QPixmap)
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
                              QFrame, QFileDialog, QInputDialog, QLabel, 
-                             QStackedWidget, QSizePolicy, QGridLayout, QPushButton, QGraphicsDropShadowEffect)
-from PyQt5.QtWebEngineWidgets import QWebEngineView
+                             QStackedWidget, QSizePolicy, QGridLayout, QPushButton, QGraphicsDropShadowEffect,
+                             QListView, QStyledItemDelegate, QStyle, QAbstractItemView, QShortcut, QToolTip, QDialog,
+                             QGraphicsScene, QGraphicsPixmapItem, QGraphicsBlurEffect, QProgressDialog)
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineProfile, QWebEngineScript
+try:
+    from PyQt5.QtWebEngineCore import QWebEngineUrlScheme, QWebEngineUrlSchemeHandler, QWebEngineUrlRequestJob
+    HAS_NOTE_SCHEME = True
+except ImportError:   # PyQt5 < 5.12: fall back to setHtml
+    QWebEngineUrlSchemeHandler = QObject
+    HAS_NOTE_SCHEME = False
 
 # --- MODERN UI ---
 from qfluentwidgets import (FluentWindow, NavigationItemPosition, FluentIcon, 
-                            SubtitleLabel, TitleLabel, BodyLabel, PrimaryPushButton, 
+                            SubtitleLabel, BodyLabel, PrimaryPushButton, 
                             PushButton, LineEdit, TextEdit, CardWidget, SimpleCardWidget,
                             InfoBar, InfoBarPosition, ScrollArea, SearchLineEdit, 
-                            setTheme, Theme, StrongBodyLabel, CaptionLabel, TransparentToolButton,
+                            setTheme, Theme, TransparentToolButton,
                             SegmentedWidget, MessageBox, ComboBox, IndeterminateProgressRing,
-                            ProgressBar, CalendarPicker)
+                            ProgressBar, CalendarPicker, SwitchButton)
 
 # --- KONFIGURACJA ---
 APP_NAME = "AI/ML Engineer's Learning Hub"
 DATA_FILE = "study_data.json"
+DB_FILE = "study_data.db"
+LOCK_FILE = "study_data.lock"  # held by the running app; the --import CLI refuses to write while it exists
+STORAGE_BACKEND = "sqlite"     # "sqlite" | "json"
+SAVE_DEBOUNCE_MS = 500         # mutations within this window are written together
+SAVE_MAX_DELAY_MS = 3000       # ...but never postponed longer than this
 NOTES_DIR = "notes_library"
+BLOB_DIR = os.path.join(NOTES_DIR, "blobs")
+NOTE_EXTS = (".html", ".htm", ".txt", ".md")   # picked up by folder import
+IMPORT_WORKERS = 8
+RECENT_ACTIVITY = 20             # entries kept in data["stats"]["recent"]
+SYNC_DEBOUNCE_MS = 400           # burst of filesystem events -> one reconcile
+SYNC_POLL_MS = 5000              # fallback when QFileSystemWatcher cannot watch NOTES_DIR
+INDEX_FILE = "notes_index.db"
+TEXT_CACHE_DIR = ".text_cache"   # None disables the on-disk layer
+TEXT_CACHE_SIZE = 64             # notes kept in memory
+RENDER_CACHE_DIR = ".render_cache"   # themed HTML, None disables the on-disk layer
+RENDER_CACHE_SIZE = 16
+NOTE_SCHEME = "note"             # note:///abs/path serves pre-themed notes to the viewer
+VIEWER_POOL_SIZE = 4             # note pages kept alive in the viewer (1 = no pooling)
+VIEWER_POOL_MAX_BYTES = 16 * 1024 * 1024   # ...as long as their source HTML stays under this
+HOVER_PRELOAD_MS = 350           # list hover time before the note is preloaded
+SEARCH_DEBOUNCE_MS = 150         # typing pause before the search box queries the index
+AI_MODEL = "gemini-flash-latest"
+AI_BACKEND = os.environ.get("SMARTSTUDY_AI_BACKEND", "gemini")   # "gemini" | "fake"
+AI_STREAMING = True
+AI_CONTEXT_TOKENS = 1200         # note context budget per question (~4 characters per token)
+CHUNK_CHARS = 800
+LEGACY_CONTEXT_CHARS = 10000     # what was sent before retrieval (the note cut to 10k), baseline for the savings stat
+AI_CACHE_FILE = "ai_cache.db"
+AI_CACHE_MAX_BYTES = 20 * 1024 * 1024
+AI_CACHE_TTL_DAYS = 30
+GEN_WORKERS = 3                  # concurrent exercise generations
+GEN_RATE_PER_MIN = 12            # request rate limit shared by the generator pool
+GEN_RETRIES = 3
+PLAYGROUND_TIMEOUT_S = 30        # runs longer than this are killed (0 = no limit)
+PLAYGROUND_MEMORY_MB = 1024      # per-worker memory limit (0 = no limit)
+PLAYGROUND_PRELOAD = ("math", "random", "statistics", "numpy")   # imported by workers while idle
+PLAYGROUND_SPARE = True          # keep a second warm worker to replace a killed/reset one instantly
+SHADOW_MODE = os.environ.get("SMARTSTUDY_SHADOWS", "cached")   # "cached" | "effect" | "off"
+DEBUG_OVERLAY = "--debug" in sys.argv or bool(os.environ.get("SMARTSTUDY_DEBUG"))
+
+# --- PALETY I MARKI ---
+PALETTES = {
+    "Neon": {"bg_main": "#0f0f14", "bg_card": "#1a1a24", "bg_elevated": "#232333", "accent": "#00f7ff",
+             "accent_light": "#00f7ff", "neon_cyan": "#22d3ee", "neon_purple": "#00f7ff", "text_main": "#f8fafc",
+             "text_sub": "#cbd5e1", "text_muted": "#94a3b8", "success": "#10b981", "warning": "#f59e0b"},
+    "Indigo": {"bg_main": "#0f0f14", "bg_card": "#1a1a24", "bg_elevated": "#232333", "accent": "#6366f1",
+               "accent_light": "#818cf8", "neon_cyan": "#22d3ee", "neon_purple": "#a78bfa", "text_main": "#f8fafc",
+               "text_sub": "#cbd5e1", "text_muted": "#94a3b8", "success": "#10b981", "warning": "#f59e0b"},
+}
+BRANDS = {
+    "hub": {"app_name": "AI/ML Engineer's Learning Hub", "palette": "Neon", "notes_title": "Notatki & Ćwiczenia",
+            "ai_subjects": ("machine", "ml", "ai")},
+    "neuralka": {"app_name": "Neuralka", "palette": "Indigo", "notes_title": "Biblioteka",
+                 "ai_subjects": ("machine", "learn", "ai")},
+}
+BRAND = os.environ.get("SMARTSTUDY_BRAND", "hub")
+if BRAND not in BRANDS: BRAND = "hub"
+BRAND_FORCED = False             # run(brand=...) pinned the brand over the one saved in settings
+
+def set_brand(brand):
+    """Brand-specific names and rules; the brand's palette is applied separately by ThemeEngine."""
+    global BRAND, APP_NAME, NOTES_TITLE, AI_SUBJECTS
+    b = BRANDS[brand]
+    BRAND, APP_NAME, NOTES_TITLE, AI_SUBJECTS = brand, b["app_name"], b["notes_title"], b["ai_subjects"]
+
+set_brand(BRAND)
+
+# --- MAGAZYN DANYCH ---
+def _dump(v): return json.dumps(v, ensure_ascii=False, sort_keys=True)
+
+def split_records(data, section=None, key=None):
+    """Split data into records: (section, None) headers plus (section, key) items of dict sections."""
+    out = {}
+    for s in ([section] if section is not None else list(data)):
+        if s not in data: continue
+        v = data[s]
+        if isinstance(v, dict):
+            out[(s, None)] = None
+            for k in ([key] if key is not None else list(v)):
+                if k in v: out[(s, k)] = _dump(v[k])
+        else:
+            out[(s, None)] = _dump(v)
+    return out
+
+def join_records(records):
+    data = {}
+    for (s, k), v in records.items():
+        if k is None: data[s] = {} if v is None else json.loads(v)
+    for (s, k), v in records.items():
+        if k is not None: data.setdefault(s, {})[k] = json.loads(v)
+    return data
+
+class RecordStore:
+    """Base storage backend: keeps a shadow of persisted records and writes only the difference."""
+    def __init__(self):
+        self._shadow = {}
+
+    def load(self):
+        self._shadow = self._read()
+        return join_records(self._shadow)
+
+    def commit(self, records, scopes):
+        """Persist `records` (output of split_records) covering `scopes`; returns True if anything was written."""
+        def in_scope(r): return any((s is None or r[0] == s) and (k is None or r[1] == k) for s, k in scopes)
+        upserts = {r: v for r, v in records.items() if r not in self._shadow or self._shadow[r] != v}
+        deletes = [r for r in self._shadow if r not in records and in_scope(r)]
+        if not upserts and not deletes: return False
+        self._write(upserts, deletes)
+        for r in deletes: del self._shadow[r]
+        self._shadow.update(upserts)
+        return True
+
+    def close(self): pass
+
+class JsonStore(RecordStore):
+    """Legacy single-file backend; still rewrites the whole file, but atomically."""
+    def __init__(self, path=DATA_FILE):
+        super().__init__()
+        self.path = path
+
+    def _read(self):
+        if not os.path.exists(self.path): return {}
+        with open(self.path, encoding='utf-8') as f: return split_records(json.load(f))
+
+    def _write(self, upserts, deletes):
+        records = {r: v for r, v in self._shadow.items() if r not in deletes}
+        records.update(upserts)
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(join_records(records), f, indent=4)
+            f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+class SqliteStore(RecordStore):
+    """One row per record, written in a single transaction; migrates DATA_FILE on first start."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS sections (name TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS items (section TEXT, key TEXT, value TEXT NOT NULL, PRIMARY KEY (section, key));
+    """
+    def __init__(self, path=DB_FILE, legacy_path=DATA_FILE):
+        super().__init__()
+        self.path = path
+        self.legacy_path = legacy_path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(self.SCHEMA)
+
+    def _read(self):
+        if self.db.execute("SELECT 1 FROM meta WHERE key='schema'").fetchone() is None: self._migrate()
+        records = {(n, None): v for n, v in self.db.execute("SELECT name, value FROM sections")}
+        records.update({(s, k): v for s, k, v in self.db.execute("SELECT section, key, value FROM items")})
+        return records
+
+    def _migrate(self):
+        records = {}
+        if os.path.exists(self.legacy_path):
+            with open(self.legacy_path, encoding='utf-8') as f: records = split_records(json.load(f))
+        with self.db:
+            self._write_rows(records, [])
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('schema', '1')")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_from', ?)", (self.legacy_path if records else "",))
+
+    def _write(self, upserts, deletes):
+        with self.db: self._write_rows(upserts, deletes)
+
+    def _write_rows(self, upserts, deletes):
+        for s, k in deletes:
+            if k is None: self.db.execute("DELETE FROM sections WHERE name=?", (s,))
+            else: self.db.execute("DELETE FROM items WHERE section=? AND key=?", (s, k))
+        for (s, k), v in upserts.items():
+            if k is None: self.db.execute("INSERT OR REPLACE INTO sections VALUES (?, ?)", (s, v))
+            else: self.db.execute("INSERT OR REPLACE INTO items VALUES (?, ?, ?)", (s, k, v))
+
+    def close(self): self.db.close()
+
+def open_store():
+    return SqliteStore() if STORAGE_BACKEND == "sqlite" else JsonStore()
+
+# Diagnostic counters shown in Settings -> Diagnostyka
+STATS = Counter()
+
+class PersistenceService(QObject):
+    """Write-behind queue: coalesces save requests and commits them on a background thread."""
+    failed = pyqtSignal(str)
+
+    def __init__(self, store, data, window_ms=SAVE_DEBOUNCE_MS, max_delay_ms=SAVE_MAX_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.data = data
+        self.max_delay = max_delay_ms / 1000
+        self._scopes = set()
+        self._requests = 0
+        self._first_request = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(window_ms)
+        self._timer.timeout.connect(self.flush)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="persistence", daemon=True)
+        self._thread.start()
+
+    def request(self, section=None, key=None):
+        STATS["saves_requested"] += 1
+        if not self._scopes: self._first_request = time.monotonic()
+        self._scopes.add((section, key))
+        self._requests += 1
+        if time.monotonic() - self._first_request >= self.max_delay: self.flush()
+        else: self._timer.start()
+
+    def flush(self, wait=False):
+        """Snapshot pending records on the calling (GUI) thread and hand them to the writer."""
+        self._timer.stop()
+        if self._scopes:
+            scopes = self._normalized(self._scopes)
+            records = {}
+            for section, key in scopes: records.update(split_records(self.data, section, key))
+            STATS["saves_coalesced"] += self._requests - 1
+            self._scopes, self._requests = set(), 0
+            self._queue.put((records, scopes))
+        if wait: self._queue.join()
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        self.store.close()
+
+    @staticmethod
+    def _normalized(scopes):
+        if (None, None) in scopes: return [(None, None)]
+        whole = {s for s, k in scopes if k is None}
+        return [(s, k) for s, k in scopes if k is None or s not in whole]
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None: return
+                if self.store.commit(*job): STATS["saves_executed"] += 1
+                else: STATS["saves_skipped"] += 1
+            except Exception as e:
+                STATS["saves_failed"] += 1
+                self.failed.emit(str(e))
+            finally:
+                self._queue.task_done()
+
+# --- PLIKI NOTATEK ---
+class BlobStore:
+    """Content-addressed note files (sha256 name) with reference counts kept in data["blobs"].
+
+    put_*() only touch the filesystem and are safe to call from worker threads;
+    retain()/release()/hold()/unhold() change the metadata and belong on the GUI thread.
+    While a worker job holds the store, unreferenced files are kept: the job may already have
+    found one as "present" and be about to retain it.
+    """
+    def __init__(self, data, root=BLOB_DIR):
+        self.data = data
+        self.root = root
+        self._holds = 0
+        self._doomed = {}   # digest -> ext of files to delete once no job holds the store
+
+    @property
+    def refs(self): return self.data.setdefault("blobs", {})
+
+    def path_for(self, digest, ext):
+        return os.path.join(self.root, digest[:2], digest + ext)
+
+    @staticmethod
+    def hash_file(path):
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""): h.update(block)
+        return h.hexdigest()
+
+    def put_file(self, src):
+        """Store `src` unless identical content is already present; returns (digest, ext, size, copied)."""
+        digest, ext, size = self.hash_file(src), os.path.splitext(src)[1].lower(), os.path.getsize(src)
+        dest = self.path_for(digest, ext)
+        if os.path.exists(dest): return digest, ext, size, False
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{threading.get_ident()}.tmp"
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+        return digest, ext, size, True
+
+    def put_bytes(self, content, ext):
+        digest = hashlib.sha256(content).hexdigest()
+        dest = self.path_for(digest, ext)
+        if os.path.exists(dest): return digest, ext, len(content), False
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f: f.write(content)
+        os.replace(tmp, dest)
+        return digest, ext, len(content), True
+
+    def retain(self, digest, ext, size):
+        """Add a reference; returns the blob path to store in the note metadata."""
+        meta = self.refs.setdefault(digest, {"refs": 0, "ext": ext, "size": size})
+        meta["refs"] += 1
+        if meta["refs"] > 1: STATS["blob_dedup_bytes"] += size
+        return self.path_for(digest, ext)
+
+    def release(self, digest):
+        """Drop a reference; deletes the file once unreferenced. Returns True if the file was removed."""
+        meta = self.refs.get(digest)
+        if meta is None: return False
+        meta["refs"] -= 1
+        if meta["refs"] > 0: return False
+        del self.refs[digest]
+        if self._holds: self._doomed[digest] = meta["ext"]
+        else: self._remove(digest, meta["ext"])
+        return True
+
+    def hold(self): self._holds += 1
+
+    def unhold(self):
+        self._holds -= 1
+        if self._holds: return
+        for digest, ext in self._doomed.items():
+            if digest not in self.refs: self._remove(digest, ext)
+        self._doomed.clear()
+
+    def _remove(self, digest, ext):
+        try: os.remove(self.path_for(digest, ext))
+        except OSError: pass
+
+def collect_files(paths):
+    """Expand folders recursively into note files; returns [(file, import root or None)]."""
+    out = []
+    for p in paths:
+        if os.path.isdir(p):
+            for dirpath, dirnames, files in os.walk(p):
+                dirnames.sort()
+                out.extend((os.path.join(dirpath, f), p) for f in sorted(files) if f.lower().endswith(NOTE_EXTS))
+        elif os.path.isfile(p):
+            out.append((p, None))
+    return out
+
+def infer_subject(path, root=None, subjects=(), default="Ogólne"):
+    """(subject, note name) from a "Subject_name" prefix, else from the folder below `root`."""
+    fname = os.path.basename(path)
+    if fname.startswith("CWICZENIA_"): return "Inne", fname
+    prefix, sep, rest = fname.partition("_")
+    known = {s.lower(): s for s in subjects}
+    if sep and rest and prefix.lower() in known: return known[prefix.lower()], rest
+    if root:
+        rel = os.path.relpath(os.path.dirname(path), root)
+        if rel != ".": return rel.split(os.sep)[0], fname
+    if sep and rest and " " not in prefix: return prefix, rest
+    return default, fname
+
+def ingest_files(blobs, files, subjects=(), subject=None, workers=IMPORT_WORKERS):
+    """Copy (deduplicated) and pre-extract text on a thread pool; returns ([(subj, name, blob)], [(file, error)])."""
+    def one(item):
+        path, root = item
+        subj, name = (subject, os.path.basename(path)) if subject else infer_subject(path, root, subjects)
+        blob = blobs.put_file(path)
+        try:
+            extract_text(blobs.path_for(blob[0], blob[1]), remember=False)
+            RENDER_CACHE.get(blobs.path_for(blob[0], blob[1]), remember=False)
+        except Exception: pass
+        return subj, name, blob
+    ok, failed = [], []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import") as pool:
+        futures = [(pool.submit(one, item), item[0]) for item in files]
+        for fut, path in futures:
+            try: ok.append(fut.result())
+            except Exception as e: failed.append((path, str(e)))
+    return ok, failed
+
+def register_note(data, blobs, subj, name, blob):
+    """Point subjects[subj][name] at a newly retained blob; returns (path, previous metadata or None)."""
+    notes = data["subjects"].setdefault(subj, {})
+    path = blobs.retain(*blob[:3])
+    old = notes.get(name)
+    notes[name] = {"path": path, "blob": blob[0], "created": str(datetime.now())}
+    count_note(data, subj, name, 0 if old else 1, "add")
+    return path, old
+
+def unregister_note(data, subj, name):
+    """Drop subjects[subj][name]; returns its metadata (None if it was not registered)."""
+    meta = data["subjects"].get(subj, {}).pop(name, None)
+    if meta is not None: count_note(data, subj, name, -1, "remove")
+    return meta
+
+# --- STATYSTYKI ---
+def note_kind(name): return "exercises" if "CWICZENIA_" in name else "notes"
+
+def count_note(data, subj, name, delta, op=None):
+    """Apply one subjects mutation to the aggregates in data["stats"] (and log it as recent activity)."""
+    st = data.setdefault("stats", {"notes": 0, "exercises": 0, "subjects": {}, "recent": []})
+    kind = note_kind(name)
+    st[kind] += delta
+    st["subjects"].setdefault(subj, {"notes": 0, "exercises": 0})[kind] += delta
+    if op: st["recent"] = [[datetime.now().isoformat(timespec="seconds"), op, subj, name]] + st["recent"][:RECENT_ACTIVITY - 1]
+
+def rebuild_stats(data):
+    """Recount data["stats"] from the subjects (migration / drift repair); keeps the activity log."""
+    recent = data.get("stats", {}).get("recent", [])
+    data["stats"] = {"notes": 0, "exercises": 0, "subjects": {}, "recent": recent}
+    for subj, notes in data["subjects"].items():
+        data["stats"]["subjects"][subj] = {"notes": 0, "exercises": 0}
+        for name in notes: count_note(data, subj, name, 1)
+    return data["stats"]
+
+# --- KALENDARZ ---
+EVENT_KINDS = {"exam": ("🎓", "Egzamin"), "deadline": ("⏰", "Termin"), "study": ("📖", "Nauka"), "note": ("📝", "Notatka")}
+
+class CalendarStore:
+    """Typed events in data["calendar"] (id -> event) plus a start-date-sorted index for range queries.
+    An event covers `date`..`end` (inclusive ISO dates) and may carry a `remind` ISO datetime."""
+    def __init__(self, data):
+        self.data = data
+        self.events = data.setdefault("calendar", {})
+        self.migrated = self._migrate()
+        self._index = sorted((ev["date"], eid) for eid, ev in self.events.items())
+        self._span = max((self._days(ev) for ev in self.events.values()), default=0)
+
+    def _migrate(self):
+        """Legacy calendar_notes ("YYYY-MM-DD" -> text) become "note" events; True if anything moved."""
+        legacy = self.data.pop("calendar_notes", None)
+        for day, text in (legacy or {}).items():
+            self.events[uuid.uuid4().hex[:12]] = {"date": day, "kind": "note", "title": text}
+        return legacy is not None
+
+    @staticmethod
+    def _days(ev):
+        return (date.fromisoformat(ev["end"]) - date.fromisoformat(ev["date"])).days if ev.get("end") else 0
+
+    def add(self, day, title, kind="note", end=None, remind=None):
+        eid = uuid.uuid4().hex[:12]
+        ev = {"date": day, "kind": kind, "title": title}
+        if end and end > day: ev["end"] = end
+        if remind: ev["remind"] = remind
+        self.events[eid] = ev
+        bisect.insort(self._index, (day, eid))
+        self._span = max(self._span, self._days(ev))
+        return eid
+
+    def remove(self, eid):
+        ev = self.events.pop(eid)
+        i = bisect.bisect_left(self._index, (ev["date"], eid))
+        del self._index[i]
+        return ev
+
+    def range(self, first, last):
+        """[(id, event)] overlapping first..last (ISO dates), by start date."""
+        lo = (date.fromisoformat(first) - timedelta(days=self._span)).isoformat()
+        i, j = bisect.bisect_left(self._index, (lo,)), bisect.bisect_right(self._index, (last, "\uffff"))
+        out = [(eid, self.events[eid]) for _, eid in self._index[i:j]]
+        return [(eid, ev) for eid, ev in out if ev.get("end", ev["date"]) >= first]
+
+    def month(self, year, month):
+        """{day: [event]} for one month, multi-day events expanded onto every day they cover."""
+        first = date(year, month, 1)
+        last = date(year, month, calendar.monthrange(year, month)[1])
+        days = {}
+        for _, ev in self.range(first.isoformat(), last.isoformat()):
+            a = max(date.fromisoformat(ev["date"]), first)
+            b = min(date.fromisoformat(ev.get("end", ev["date"])), last)
+            for d in range(a.day, b.day + 1): days.setdefault(d, []).append(ev)
+        return days
+
+    def day(self, iso):
+        return self.range(iso, iso)
+
+def ensure_stats(data):
+    """Cheap consistency check on load (O(subjects)); returns True when the aggregates had to be rebuilt."""
+    st = data.get("stats")
+    if (st and set(st.get("subjects", ())) >= set(data["subjects"]) and
+            all(sum(st["subjects"][s].values()) == len(n) for s, n in data["subjects"].items())):
+        return False
+    rebuild_stats(data)
+    return True
+
+def release_file(blobs, meta):
+    """Blobs lose one reference, legacy copies are deleted; returns the path if the file is gone."""
+    path = meta.get("path", "")
+    if "blob" in meta: return path if blobs.release(meta["blob"]) else None
+    if os.path.exists(path):
+        os.remove(path)
+        return path
+    return None
+
+# --- WYSZUKIWANIE ---
+_FOLD = str.maketrans({"ł": "l", "Ł": "L"})
+_WORD = re.compile(r"\w+")
+_SUFFIXES = ("owania", "owanie", "ania", "anie", "enia", "enie", "ami", "ach", "owi", "ego", "emu",
+             "ych", "ymi", "imi", "iej", "ow", "om", "em", "ie", "ia", "ii", "ej", "a", "e", "i", "o", "u", "y")
+
+def fold(text):
+    """Lowercase and strip Polish diacritics ("Macierz Odwrotną" -> "macierz odwrotna")."""
+    text = unicodedata.normalize("NFKD", text.translate(_FOLD).lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+def stem(word):
+    """Stemming-lite: drop one common Polish inflection ending, keeping at least 4 letters."""
+    for suf in _SUFFIXES:
+        if word.endswith(suf) and len(word) - len(suf) >= 4: return word[:-len(suf)]
+    return word
+
+def tokenize(text):
+    return [stem(w) for w in _WORD.findall(fold(text)) if len(w) > 1]
+
+def html_to_text(raw):
+    if HAS_BS4: return bs4.BeautifulSoup(raw, "html.parser").get_text()
+    return re.sub(r"<[^>]+>", " ", raw)
+
+class TextCache:
+    """Extracted note text keyed by path + mtime + size: in-memory LRU, optionally mirrored on disk."""
+    def __init__(self, max_entries=TEXT_CACHE_SIZE, disk_dir=TEXT_CACHE_DIR):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir: os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def _key(path):
+        st = os.stat(path)
+        return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+    def peek(self, path):
+        """Memory-only lookup, cheap enough for the GUI thread; None on a miss."""
+        try: key = self._key(path)
+        except OSError: return None
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                STATS["text_cache_hits"] += 1
+                return self._mem[key]
+        return None
+
+    def get(self, path, remember=True):
+        """Cached text of `path`, extracting on a miss; `remember=False` skips the memory LRU (bulk indexing)."""
+        text = self.peek(path)
+        if text is not None: return text
+        key = self._key(path)
+        text = self._load_disk(key)
+        if text is None:
+            STATS["text_cache_misses"] += 1
+            with open(path, encoding='utf-8', errors='replace') as f: text = html_to_text(f.read())
+            self._save_disk(key, text)
+        if remember:
+            with self._lock:
+                self._mem[key] = text
+                while len(self._mem) > self.max_entries: self._mem.popitem(last=False)
+        return text
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, hashlib.sha1(key[0].encode('utf-8')).hexdigest() + ".txt")
+
+    def _load_disk(self, key):
+        if not self.disk_dir: return None
+        try:
+            with open(self._disk_path(key), encoding='utf-8') as f:
+                if f.readline().rstrip("\n") != f"{key[1]} {key[2]}": return None
+                STATS["text_cache_disk_hits"] += 1
+                return f.read()
+        except OSError: return None
+
+    def forget(self, path):
+        """Drop every entry of a note that is gone, memory and disk."""
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [k for k in self._mem if k[0] == path]: del self._mem[key]
+        if self.disk_dir:
+            try: os.remove(self._disk_path((path,)))
+            except OSError: pass
+
+    def _save_disk(self, key, text):
+        if not self.disk_dir: return
+        tmp = self._disk_path(key) + f".{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f: f.write(f"{key[1]} {key[2]}\n{text}")
+            os.replace(tmp, self._disk_path(key))
+        except OSError: pass
+
+TEXT_CACHE = TextCache()
+
+def extract_text(path, remember=True): return TEXT_CACHE.get(path, remember)
+
+# --- PODGLĄD ---
+def viewer_css():
+    """Viewer stylesheet for the current palette."""
+    c = THEME.c
+    return f"""
+        * {{ color: {c['text_main']} !important; }}
+        body, html {{ 
+            background-color: {c['bg_main']} !important; 
+            font-family: 'Segoe UI', -apple-system, sans-serif !important;
+            padding: 48px !important;
+            max-width: 900px !important;
+            margin: 0 auto !important;
+            line-height: 1.7 !important;
+        }}
+        div, p, span, table, tr, td, th, section, article, aside, li, ul {{
+            background-color: {c['bg_card']} !important; 
+            border-color: rgba(255, 255, 255, 0.05) !important;
+        }}
+        h1, h2, h3, h4 {{ 
+            color: {c['accent_light']} !important; 
+            background-color: transparent !important; 
+            margin-top: 32px !important;
+            margin-bottom: 16px !important;
+            font-weight: 700 !important;
+            letter-spacing: -0.5px !important;
+        }}
+        h1 {{ font-size: 36px !important; }}
+        h2 {{ font-size: 28px !important; }}
+        h3 {{ font-size: 22px !important; }}
+        a {{ color: {c['neon_cyan']} !important; text-decoration: none !important; }}
+        a:hover {{ text-decoration: underline !important; }}
+        code, pre {{ 
+            background-color: #000000 !important; 
+            color: {c['success']} !important; 
+            border: 1px solid rgba(255, 255, 255, 0.1) !important;
+            padding: 2px 6px !important;
+            border-radius: 6px !important;
+            font-family: 'Consolas', monospace !important;
+        }}
+        pre {{ 
+            padding: 16px !important; 
+            margin: 16px 0 !important;
+            overflow-x: auto !important;
+        }}
+        img {{ border-radius: 12px; opacity: 0.95; max-width: 100% !important; }}
+        
+        details {{
+            background-color: {c['bg_elevated']} !important;
+            border: 1px solid rgba(255, 255, 255, 0.1) !important;
+            padding: 20px !important;
+            border-radius: 12px !important;
+            margin-top: 20px !important;
+        }}
+        summary {{
+            cursor: pointer !important;
+            color: {c['accent_light']} !important;
+            font-weight: 700 !important;
+            outline: none !important;
+            font-size: 16px !important;
+            padding: 4px 0 !important;
+        }}
+        summary:hover {{
+            color: {c['accent']} !important;
+        }}
+        table {{
+            border-collapse: collapse !important;
+            width: 100% !important;
+            margin: 20px 0 !important;
+        }}
+        th, td {{
+            padding: 12px !important;
+            text-align: left !important;
+            border: 1px solid rgba(255, 255, 255, 0.1) !important;
+        }}
+        th {{
+            background-color: {c['bg_elevated']} !important;
+            font-weight: 700 !important;
+        }}
+        """
+
+THEME_STYLE_ID = "smartstudy-theme"
+_HEAD_TAG = re.compile(rb"<head\b[^>]*>", re.I)
+_HTML_TAG = re.compile(rb"<html\b[^>]*>", re.I)
+_CHARSET = re.compile(rb"<meta[^>]+charset", re.I)
+
+def theme_html(raw, path, css):
+    """Note bytes -> HTML with `css` inlined into <head>; plain text notes are escaped into a page."""
+    style = f'<style id="{THEME_STYLE_ID}">{css}</style>'.encode('utf-8')
+    if not path.lower().endswith((".html", ".htm")):
+        body = html_escape(raw.decode('utf-8', 'replace')).encode('utf-8')
+        return (b'<!DOCTYPE html><html><head><meta charset="utf-8">' + style +
+                b'</head><body><div style="white-space: pre-wrap !important">' + body + b'</div></body></html>')
+    if not _CHARSET.search(raw, 0, 2048): style = b'<meta charset="utf-8">' + style
+    m = _HEAD_TAG.search(raw)
+    if m: return raw[:m.end()] + style + raw[m.end():]
+    m = _HTML_TAG.search(raw)
+    if m: return raw[:m.end()] + b"<head>" + style + b"</head>" + raw[m.end():]
+    return b"<head>" + style + b"</head>" + raw
+
+class RenderCache:
+    """Themed note HTML keyed by path + mtime + size + stylesheet hash: memory LRU mirrored on disk."""
+    def __init__(self, max_entries=RENDER_CACHE_SIZE, disk_dir=RENDER_CACHE_DIR):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._css = (None, None)
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+        if disk_dir: os.makedirs(disk_dir, exist_ok=True)
+
+    def _theme(self):
+        css = viewer_css()
+        if self._css[0] != css: self._css = (css, hashlib.sha1(css.encode('utf-8')).hexdigest()[:12])
+        return self._css
+
+    def get(self, path, remember=True):
+        st = os.stat(path)
+        css, theme = self._theme()
+        key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, theme)
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                STATS["render_cache_hits"] += 1
+                return self._mem[key]
+        html = self._load_disk(key)
+        if html is None:
+            STATS["render_cache_misses"] += 1
+            with open(path, 'rb') as f: html = theme_html(f.read(), path, css)
+            self._save_disk(key, html)
+        if remember:
+            with self._lock:
+                self._mem[key] = html
+                while len(self._mem) > self.max_entries: self._mem.popitem(last=False)
+        return html
+
+    def prefetch(self, path):
+        """Render `path` in the background so the first open is already a cache hit."""
+        def run():
+            try: self.get(path, remember=False)
+            except OSError: pass
+        self._pool.submit(run)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, hashlib.sha1(key[0].encode('utf-8')).hexdigest() + ".html")
+
+    def _load_disk(self, key):
+        if not self.disk_dir: return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                if f.readline().rstrip(b"\n") != f"{key[1]} {key[2]} {key[3]}".encode(): return None
+                STATS["render_cache_disk_hits"] += 1
+                return f.read()
+        except OSError: return None
+
+    def forget(self, path):
+        """Drop every entry of a note that is gone (all themes), memory and disk."""
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [k for k in self._mem if k[0] == path]: del self._mem[key]
+        if self.disk_dir:
+            try: os.remove(self._disk_path((path,)))
+            except OSError: pass
+
+    def _save_disk(self, key, html):
+        if not self.disk_dir: return
+        tmp = self._disk_path(key) + f".{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'wb') as f: f.write(f"{key[1]} {key[2]} {key[3]}\n".encode() + html)
+            os.replace(tmp, self._disk_path(key))
+        except OSError: pass
 
-# Kolory - Enhanced palette
-C_BG_MAIN = "#0f0f14"        # Deeper background
-C_BG_CARD = "#1a1a24"        # Card background
-C_BG_ELEVATED = "#232333"     # Elevated elements
-C_ACCENT = "#00f7ff"          # Indigo accent
-C_ACCENT_LIGHT = "#00f7ff"    # Light indigo
-C_NEON_CYAN = "#22d3ee"       # Cyan for subjects
-C_NEON_PURPLE = "#00f7ff"     # Purple accent
-C_TEXT_MAIN = "#f8fafc"       
-C_TEXT_SUB = "#cbd5e1"
-C_TEXT_MUTED = "#94a3b8"
-C_SUCCESS = "#10b981"
-C_WARNING = "#f59e0b"
+RENDER_CACHE = RenderCache()
+
+def forget_cached(path):
+    """The note file is gone for good: its extracted text and themed HTML can go too."""
+    TEXT_CACHE.forget(path)
+    RENDER_CACHE.forget(path)
+
+class NoteSchemeHandler(QWebEngineUrlSchemeHandler):
+    """note:// -> pre-themed note HTML from RENDER_CACHE; other files (images, scripts) are served as is."""
+    def requestStarted(self, job):
+        url = QUrl(job.requestUrl())
+        url.setScheme("file")
+        path = url.toLocalFile()
+        try:
+            if path.lower().endswith(NOTE_EXTS):
+                body, mime = RENDER_CACHE.get(path), b"text/html"
+            else:
+                with open(path, 'rb') as f: body = f.read()
+                mime = (mimetypes.guess_type(path)[0] or "application/octet-stream").encode()
+        except OSError:
+            job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+            return
+        buf = QBuffer(job)
+        buf.setData(body)
+        job.reply(mime, buf)
+
+def register_note_scheme():
+    """Must run before QApplication is created."""
+    if not HAS_NOTE_SCHEME: return
+    scheme = QWebEngineUrlScheme(NOTE_SCHEME.encode())
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Path)
+    scheme.setFlags(QWebEngineUrlScheme.LocalScheme | QWebEngineUrlScheme.LocalAccessAllowed)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+def install_note_scheme(profile):
+    if HAS_NOTE_SCHEME and profile.urlSchemeHandler(NOTE_SCHEME.encode()) is None:
+        profile.installUrlSchemeHandler(NOTE_SCHEME.encode(), NoteSchemeHandler(profile))
+
+def install_theme_script(profile):
+    """One DocumentReady user script styles pages that did not come pre-themed (file://, http links).
+    Replaces the previous version, so calling it again after a palette change keeps exactly one."""
+    scripts = profile.scripts()
+    for old in scripts.findScripts(THEME_STYLE_ID): scripts.remove(old)
+    script = QWebEngineScript()
+    script.setName(THEME_STYLE_ID)
+    script.setInjectionPoint(QWebEngineScript.DocumentReady)
+    script.setWorldId(QWebEngineScript.ApplicationWorld)
+    script.setRunsOnSubFrames(False)
+    script.setSourceCode(
+        f"if (!document.getElementById({json.dumps(THEME_STYLE_ID)})) {{"
+        f" var s = document.createElement('style'); s.id = {json.dumps(THEME_STYLE_ID)};"
+        f" s.textContent = {json.dumps(viewer_css())}; (document.head || document.documentElement).appendChild(s); }}")
+    scripts.insert(script)
+    STATS["viewer_script_installs"] += 1
+
+class TextService(QObject):
+    """Extracts note text on a worker thread and hands it back to callbacks on the GUI thread."""
+    _ready = pyqtSignal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="text")
+        self._pending = {}
+        self._ready.connect(self._deliver)
+
+    def request(self, path, callback=None):
+        """Call `callback(text)` (None if unreadable) - synchronously on a memory hit, else later."""
+        text = TEXT_CACHE.peek(path)
+        if text is not None:
+            if callback: callback(text)
+            return
+        first = path not in self._pending
+        self._pending.setdefault(path, []).append(callback)
+        if first: self._pool.submit(self._extract, path)
+
+    def _extract(self, path):
+        try: text = extract_text(path)
+        except Exception: text = None
+        self._ready.emit(path, text)
+
+    def _deliver(self, path, text):
+        for cb in self._pending.pop(path, []):
+            if cb: cb(text)
+
+    def close(self): self._pool.shutdown(wait=False, cancel_futures=True)
+
+class NoteIndex:
+    """Persistent inverted index (term -> path, tf) over note files, ranked with BM25."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS docs (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, length INTEGER);
+        CREATE TABLE IF NOT EXISTS postings (term TEXT, path TEXT, tf INTEGER, PRIMARY KEY (term, path)) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS postings_path ON postings (path);
+    """
+    K1, B = 1.2, 0.75
+
+    def __init__(self, path=INDEX_FILE):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(self.SCHEMA)
+        self._version = None
+        self._doc_len = {}
+
+    def update(self, path):
+        """(Re)index `path` if its mtime/size changed; returns True when the index changed."""
+        try: st = os.stat(path)
+        except OSError: return self.remove(path)
+        row = self.db.execute("SELECT mtime, size FROM docs WHERE path=?", (path,)).fetchone()
+        if row == (st.st_mtime, st.st_size): return False
+        try: terms = Counter(tokenize(extract_text(path, remember=False)))
+        except Exception: terms = Counter()
+        self._version = None
+        with self.db:
+            self.db.execute("DELETE FROM postings WHERE path=?", (path,))
+            self.db.executemany("INSERT INTO postings VALUES (?, ?, ?)", [(t, path, n) for t, n in terms.items()])
+            self.db.execute("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?)",
+                            (path, st.st_mtime, st.st_size, sum(terms.values())))
+        return True
+
+    def remove(self, path):
+        self._version = None
+        with self.db:
+            self.db.execute("DELETE FROM postings WHERE path=?", (path,))
+            return self.db.execute("DELETE FROM docs WHERE path=?", (path,)).rowcount > 0
+
+    def sync(self, paths):
+        """Drop documents not in `paths` and refresh the rest."""
+        paths = set(paths)
+        changed = False
+        for (p,) in self.db.execute("SELECT path FROM docs").fetchall():
+            if p not in paths: changed |= self.remove(p)
+        for p in paths: changed |= self.update(p)
+        return changed
+
+    def search(self, query, limit=100):
+        """Return {path: score}; the last query word also matches as a prefix (search-as-you-type)."""
+        words = [w for w in _WORD.findall(fold(query)) if len(w) > 1]
+        lengths = self._lengths()
+        if not words or not lengths: return {}
+        n = len(lengths)
+        avgdl = sum(lengths.values()) / n or 1
+        k1, b = self.K1, self.B
+        scores = Counter()
+        for i, w in enumerate(words):
+            terms = {stem(w)}
+            if i == len(words) - 1 and len(w) >= 3:
+                terms.update(t for (t,) in self.db.execute(
+                    "SELECT DISTINCT term FROM postings WHERE term >= ? AND term < ?", (w, w + "\uffff")))
+            best = {}
+            for t in terms:
+                rows = self.db.execute("SELECT path, tf FROM postings WHERE term=?", (t,)).fetchall()
+                if not rows: continue
+                idf = math.log(1 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+                for path, tf in rows:
+                    sc = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths.get(path, avgdl) / avgdl))
+                    if sc > best.get(path, 0): best[path] = sc
+            scores.update(best)
+        return dict(scores.most_common(limit))
+
+    def _lengths(self):
+        """Document lengths, reloaded only when some connection has committed since the last query."""
+        version = self.db.execute("PRAGMA data_version").fetchone()[0]
+        if self._version != version:
+            self._version = version
+            self._doc_len = dict(self.db.execute("SELECT path, length FROM docs"))
+        return self._doc_len
+
+    def close(self): self.db.close()
+
+def chunk_text(text, size=CHUNK_CHARS):
+    """Pack non-empty lines into chunks of about `size` characters."""
+    chunks, cur = [], ""
+    for line in (ln.strip() for ln in text.splitlines()):
+        if not line: continue
+        if cur and len(line) > size:
+            chunks.append(cur); cur = ""
+        while len(line) > size:
+            cut = line.rfind(" ", 0, size)
+            cut = cut if cut > size // 2 else size
+            chunks.append(line[:cut])
+            line = line[cut:].strip()
+        if cur and len(cur) + len(line) + 1 > size:
+            chunks.append(cur); cur = ""
+        cur = f"{cur}\n{line}" if cur else line
+    if cur: chunks.append(cur)
+    return chunks
+
+class ChunkIndex:
+    """BM25 over the chunks of a single note, used to pick the context sent with a question."""
+    K1, B = 1.2, 0.75
+
+    def __init__(self, text):
+        self.chunks = chunk_text(text)
+        self.tfs = [Counter(tokenize(c)) for c in self.chunks]
+        self.lengths = [sum(tf.values()) for tf in self.tfs]
+        self.avgdl = sum(self.lengths) / len(self.lengths) if self.chunks else 1
+        self.df = Counter(t for tf in self.tfs for t in tf)
+
+    def scores(self, question):
+        n, k1, b = len(self.chunks), self.K1, self.B
+        out = [0.0] * n
+        for t in set(tokenize(question)):
+            if t not in self.df: continue
+            idf = math.log(1 + (n - self.df[t] + 0.5) / (self.df[t] + 0.5))
+            for i, tf in enumerate(self.tfs):
+                if t in tf:
+                    out[i] += idf * tf[t] * (k1 + 1) / (tf[t] + k1 * (1 - b + b * self.lengths[i] / (self.avgdl or 1)))
+        return out
+
+    def select(self, question, budget_chars):
+        """Matching chunks (best first, each with at most one neighbour) that fit the budget, in document
+        order; the leading chunks only if nothing matches."""
+        scores = self.scores(question)
+        hits = sorted((i for i, sc in enumerate(scores) if sc > 0), key=lambda i: (-scores[i], i))
+        picked, used = set(), 0
+        def take(i):
+            nonlocal used
+            if i in picked or used + len(self.chunks[i]) > budget_chars: return False
+            picked.add(i); used += len(self.chunks[i]) + 7
+            return True
+        for i in hits:
+            if not take(i): continue
+            if not (i + 1 < len(self.chunks) and take(i + 1)) and i > 0: take(i - 1)
+        if not hits:
+            for i in range(len(self.chunks)):
+                if not take(i): break
+        return "\n[...]\n".join(self.chunks[i] for i in sorted(picked))
+
+_CHUNK_INDEXES = OrderedDict()
+_CHUNK_LOCK = threading.Lock()
+
+def select_context(text, question, budget_tokens=AI_CONTEXT_TOKENS):
+    """Note context for `question`: the whole note if it fits the budget, otherwise retrieved chunks."""
+    budget = budget_tokens * 4
+    if len(text) <= budget:
+        STATS["ai_ctx_chars_last"] = len(text)
+        return text
+    key = hashlib.sha1(text.encode('utf-8', 'replace')).digest()
+    with _CHUNK_LOCK:
+        index = _CHUNK_INDEXES.pop(key, None) or ChunkIndex(text)
+        _CHUNK_INDEXES[key] = index
+        while len(_CHUNK_INDEXES) > 16: _CHUNK_INDEXES.popitem(last=False)
+    ctx = index.select(question, budget)
+    STATS["ai_ctx_chars_last"] = len(ctx)
+    STATS["ai_ctx_chars_saved"] += min(len(text), LEGACY_CONTEXT_CHARS) - len(ctx)
+    return ctx
+
+class IndexService(QObject):
+    """Runs NoteIndex updates on a background thread; searches run on the caller's thread."""
+    changed = pyqtSignal()
+
+    def __init__(self, path=INDEX_FILE, parent=None):
+        super().__init__(parent)
+        self.index = NoteIndex(path)
+        self._path = path
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="indexer", daemon=True)
+        self._thread.start()
+
+    def update(self, path): self._queue.put(("update", path))
+    def remove(self, path): self._queue.put(("remove", path))
+    def sync(self, paths): self._queue.put(("sync", list(paths)))
+
+    def search(self, query, limit=100):
+        t0 = time.perf_counter()
+        hits = self.index.search(query, limit)
+        STATS["search_last_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        return hits
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self.index.close()
+
+    def _run(self):
+        writer = NoteIndex(self._path)
+        while True:
+            job = self._queue.get()
+            if job is None: break
+            op, arg = job
+            try:
+                if getattr(writer, op)(arg): self.changed.emit()
+            except Exception:
+                STATS["index_errors"] += 1
+        writer.close()
+
+# --- KLIENT AI ---
+class GeminiBackend:
+    """Process-wide Gemini client: configured once per API key, model handles reused across requests."""
+    name = "gemini"
+    available = HAS_AI
+
+    def __init__(self):
+        self._key = None
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def model(self, key, name=AI_MODEL):
+        with self._lock:
+            if key != self._key:
+                genai.configure(api_key=key)
+                self._key = key
+                self._models.clear()
+                STATS["ai_reconfigured"] += 1
+            if name not in self._models:
+                self._models[name] = genai.GenerativeModel(name)
+                STATS["ai_models_created"] += 1
+            return self._models[name]
+
+    def generate(self, key, prompt, model=AI_MODEL):
+        STATS["ai_requests"] += 1
+        return self.model(key, model).generate_content(prompt).text
+
+    def stream(self, key, prompt, model=AI_MODEL):
+        STATS["ai_requests"] += 1
+        for chunk in self.model(key, model).generate_content(prompt, stream=True):
+            try: text = chunk.text
+            except ValueError: continue      # chunk without text parts (e.g. safety metadata)
+            if text: yield text
+
+class FakeBackend:
+    """Offline stand-in for tests and benchmarks (SMARTSTUDY_AI_BACKEND=fake)."""
+    name = "fake"
+    available = True
+
+    def __init__(self, latency=float(os.environ.get("SMARTSTUDY_FAKE_LATENCY", "0.2"))):
+        self.latency = latency
+
+    def generate(self, key, prompt, model=AI_MODEL):
+        STATS["ai_requests"] += 1
+        time.sleep(self.latency)
+        if "HTML5 Exercise Sheet" in prompt:
+            return "".join(f"<h2>Zadanie {i}</h2><p>Przykładowe zadanie offline.</p>"
+                           f"<details><summary>Kliknij, aby sprawdzić rozwiązanie</summary><p>42</p></details>" for i in (1, 2, 3))
+        return f"[offline] Otrzymano {len(prompt)} znaków promptu."
+
+    def stream(self, key, prompt, model=AI_MODEL):
+        words = self.generate(key, prompt, model).split(" ")
+        for i, w in enumerate(words):
+            time.sleep(self.latency / 10)
+            yield w if i == 0 else " " + w
+
+_AI_CLIENT = None
+_AI_CLIENT_LOCK = threading.Lock()
+
+def ai_client():
+    global _AI_CLIENT
+    with _AI_CLIENT_LOCK:
+        if _AI_CLIENT is None or _AI_CLIENT.name != AI_BACKEND:
+            _AI_CLIENT = FakeBackend() if AI_BACKEND == "fake" else GeminiBackend()
+        return _AI_CLIENT
+
+class ResponseCache:
+    """Answers keyed by model + normalized question + hash of the context sent; TTL plus size-bounded LRU."""
+    def __init__(self, path=AI_CACHE_FILE, max_bytes=AI_CACHE_MAX_BYTES, ttl_days=AI_CACHE_TTL_DAYS):
+        self.max_bytes = max_bytes
+        self.ttl = ttl_days * 86400
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT, size INTEGER, created REAL, last_used REAL);
+            CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used);
+        """)
+
+    @staticmethod
+    def key(model, question, ctx):
+        q = " ".join(fold(question).split()).rstrip("?!. ")
+        ctx_hash = hashlib.sha256(ctx.encode('utf-8', 'replace')).hexdigest()
+        return hashlib.sha256(f"{model}\0{q}\0{ctx_hash}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self.db:
+            row = self.db.execute("SELECT response, created FROM responses WHERE key=?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl:
+                self.db.execute("DELETE FROM responses WHERE key=?", (key,))
+                row = None
+            if row is None:
+                STATS["ai_cache_misses"] += 1
+                return None
+            self.db.execute("UPDATE responses SET last_used=? WHERE key=?", (now, key))
+        STATS["ai_cache_hits"] += 1
+        return row[0]
+
+    def put(self, key, response):
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", (key, response, size, now, now))
+            self.db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                for k, sz in self.db.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+                    if total <= self.max_bytes: break
+                    self.db.execute("DELETE FROM responses WHERE key=?", (k,))
+                    total -= sz
+                    STATS["ai_cache_evictions"] += 1
+
+_AI_CACHE = None
+
+def ai_cache():
+    global _AI_CACHE
+    with _AI_CLIENT_LOCK:
+        if _AI_CACHE is None: _AI_CACHE = ResponseCache()
+        return _AI_CACHE
 
 # --- WORKERS ---
-class AIWorker(QThread):
-    finished = pyqtSignal(str)
-    def __init__(self, key, prompt, ctx=""): super().__init__(); self.key=key; self.prompt=prompt; self.ctx=ctx
+class BulkImportJob(QThread):
+    finished = pyqtSignal(list, list)
+    def __init__(self, blobs, files, subjects, subject=None, parent=None):
+        super().__init__(parent); self.blobs=blobs; self.files=files; self.subjects=subjects; self.subject=subject
     def run(self):
-        if not HAS_AI: return self.finished.emit("Brak bibliotek AI")
-        try:
-            genai.configure(api_key=self.key)
-            model = genai.GenerativeModel('gemini-flash-latest')
-            resp = model.generate_content(f"CTX:{self.ctx[:10000]} TASK:{self.prompt}")
-            self.finished.emit(resp.text)
-        except Exception as e: self.finished.emit(str(e))
-
-class HTMLGenWorker(QThread):
-    finished = pyqtSignal(str, str)
-    def __init__(self, key, content, title): super().__init__(); self.key=key; self.c=content; self.t=title
+        self.finished.emit(*ingest_files(self.blobs, self.files, self.subjects, self.subject))
+
+class AIWorker(QThread):
+    """Answers one question; text arrives through `chunk` (once, or incrementally when streaming)."""
+    chunk = pyqtSignal(str)
+    first_token = pyqtSignal(float)      # ms since start
+    cached = pyqtSignal()                # answer served from ResponseCache
+    finished = pyqtSignal(str)           # full answer
+    def __init__(self, key, prompt, ctx="", stream=AI_STREAMING):
+        super().__init__(); self.key=key; self.prompt=prompt; self.ctx=ctx; self.stream=stream
     def run(self):
+        client = ai_client()
+        if not client.available:
+            self.chunk.emit("Brak bibliotek AI")
+            return self.finished.emit("")
+        t0 = time.perf_counter()
+        ctx = select_context(self.ctx, self.prompt)
+        prompt = f"CTX:{ctx} TASK:{self.prompt}"
+        parts = []
         try:
-            genai.configure(api_key=self.key)
-            model = genai.GenerativeModel('gemini-flash-latest')
-            prompt = (f"You are a strict teacher. Generate a HTML5 Exercise Sheet based on the text below.\n"
-                      f"RULES:\n"
-                      f"1. Do NOT summarize the text. I do not want notes.\n"
-                      f"2. Create EXACTLY 3 distinct, practical problems/tasks (Zadanie 1, Zadanie 2, Zadanie 3).\n"
-                      f"3. For each task, provide the correct solution/answer HIDDEN inside a <details> tag.\n"
-                      f"4. The <summary> tag must display text: 'Kliknij, aby sprawdzić rozwiązanie'.\n"
-                      f"5. Use strictly HTML tags. No markdown formatting (no ```html).\n"
-                      f"6. Make sure the text color is contrastive (white/light gray) because background is dark.\n\n"
-                      f"SOURCE TEXT: {self.c[:7000]}")
-            resp = model.generate_content(prompt)
-            clean = resp.text.replace("```html","").replace("```","").strip()
-            clean_title = self.t.replace(".html", "")
-            self.finished.emit(f"CWICZENIA_{clean_title}.html".replace(" ","_"), clean)
-        except: pass
+            cache_key = ResponseCache.key(f"{client.name}:{AI_MODEL}", self.prompt, ctx)
+            hit = ai_cache().get(cache_key)
+            if hit is not None:
+                self.cached.emit()
+                self.first_token.emit(round((time.perf_counter() - t0) * 1000, 1))
+                self.chunk.emit(hit)
+                return self.finished.emit(hit)
+            pieces = client.stream(self.key, prompt) if self.stream else iter([client.generate(self.key, prompt)])
+            for piece in pieces:
+                if self.isInterruptionRequested():
+                    self.chunk.emit(" [przerwano]")
+                    STATS["ai_cancelled"] += 1
+                    break
+                if not parts:
+                    ttft = round((time.perf_counter() - t0) * 1000, 1)
+                    STATS["ai_ttft_last_ms"] = ttft
+                    self.first_token.emit(ttft)
+                parts.append(piece)
+                self.chunk.emit(piece)
+            else:
+                if parts: ai_cache().put(cache_key, "".join(parts))
+            self.finished.emit("".join(parts))
+        except Exception as e:
+            self.chunk.emit(str(e))
+            self.finished.emit("")
+
+def generate_exercises(key, content, title):
+    """Ask the model for an exercise sheet; returns (file name, html)."""
+    prompt = (f"You are a strict teacher. Generate a HTML5 Exercise Sheet based on the text below.\n"
+              f"RULES:\n"
+              f"1. Do NOT summarize the text. I do not want notes.\n"
+              f"2. Create EXACTLY 3 distinct, practical problems/tasks (Zadanie 1, Zadanie 2, Zadanie 3).\n"
+              f"3. For each task, provide the correct solution/answer HIDDEN inside a <details> tag.\n"
+              f"4. The <summary> tag must display text: 'Kliknij, aby sprawdzić rozwiązanie'.\n"
+              f"5. Use strictly HTML tags. No markdown formatting (no ```html).\n"
+              f"6. Make sure the text color is contrastive (white/light gray) because background is dark.\n\n"
+              f"SOURCE TEXT: {content[:7000]}")
+    client = ai_client()
+    if not client.available: raise RuntimeError("Brak bibliotek AI")
+    text = client.generate(key, prompt)
+    clean = text.replace("```html","").replace("```","").strip()
+    if not clean: raise RuntimeError("Pusta odpowiedź modelu")
+    clean_title = title.replace(".html", "")
+    return f"CWICZENIA_{clean_title}.html".replace(" ","_"), clean
+
+_TRANSIENT_CODES = {408, 429, 500, 502, 503, 504}
+_TRANSIENT_NAMES = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+                    "BadGateway", "GatewayTimeout", "DeadlineExceeded"}
+
+def is_transient(exc):
+    """Rate limits, server errors, timeouts and dropped connections are worth retrying; anything else is not."""
+    if isinstance(exc, (TimeoutError, ConnectionError)): return True
+    return getattr(exc, "code", None) in _TRANSIENT_CODES or type(exc).__name__ in _TRANSIENT_NAMES
+
+class RateLimiter:
+    """Spaces calls at least 60/per_minute seconds apart across all threads."""
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, cancelled=lambda: False):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        while not cancelled() and time.monotonic() < slot:
+            time.sleep(min(0.25, slot - time.monotonic()))
+
+class BatchGenerator(QObject):
+    """Generates exercise sheets for many notes through a bounded pool with rate limiting and retry/backoff."""
+    progress = pyqtSignal(int, int, str)     # done, total, title
+    item_done = pyqtSignal(str, str)         # file name, html
+    item_failed = pyqtSignal(str, str)       # title, error
+    finished = pyqtSignal(dict)              # report
+
+    def __init__(self, key, items, workers=GEN_WORKERS, per_minute=GEN_RATE_PER_MIN, retries=GEN_RETRIES, parent=None):
+        super().__init__(parent)
+        self.key = key
+        self.items = list(items)             # [(path, title)]
+        self.workers = workers
+        self.retries = retries
+        self.limiter = RateLimiter(per_minute)
+        self._lock = threading.Lock()
+        self._done = 0
+        self._cancelled = False
+        self.report = {"total": len(self.items), "ok": 0, "failed": [], "cancelled": 0, "retries": 0}
+        self._futures = []
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="gen")
+        self._futures = [self._pool.submit(self._run_one, path, title) for path, title in self.items]
+        self._pool.shutdown(wait=False)
+
+    def cancel(self): self._cancelled = True
+
+    def wait(self, timeout=None):
+        """Block until every item has finished (or `timeout` seconds); True if nothing is left running."""
+        return not wait_futures(self._futures, timeout).not_done
+
+    def _sleep(self, secs):
+        """Backoff that gives up as soon as the batch is cancelled."""
+        end = time.monotonic() + secs
+        while not self._cancelled and time.monotonic() < end: time.sleep(min(0.2, end - time.monotonic()))
+
+    def _run_one(self, path, title):
+        try: content = extract_text(path, remember=False)
+        except Exception as e: return self._finish_item(title, None, f"Nie można odczytać pliku: {e}")
+        err = None
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire(lambda: self._cancelled)
+            if self._cancelled: break
+            try: return self._finish_item(title, generate_exercises(self.key, content, title), None)
+            except Exception as e:
+                err = str(e)
+                if not is_transient(e): break
+            if attempt < self.retries:
+                with self._lock: self.report["retries"] += 1
+                STATS["gen_retries"] += 1
+                self._sleep(min(30, 2 ** attempt * 2) * random.uniform(0.75, 1.25))
+        self._finish_item(title, None, err)
+
+    def _finish_item(self, title, result, err):
+        """`result` None with `err` None means the item was cancelled before it could succeed."""
+        with self._lock:
+            self._done += 1
+            if result:
+                self.report["ok"] += 1
+                STATS["gen_ok"] += 1
+                self.item_done.emit(*result)
+            elif err is None:
+                self.report["cancelled"] += 1
+                STATS["gen_cancelled"] += 1
+            else:
+                self.report["failed"].append((title, err))
+                STATS["gen_failed"] += 1
+                self.item_failed.emit(title, err)
+            self.progress.emit(self._done, len(self.items), title)
+            if self._done == len(self.items):
+                secs = time.perf_counter() - self._t0
+                self.report["seconds"] = round(secs, 1)
+                self.report["per_min"] = round(self.report["ok"] * 60 / secs, 1) if secs else 0.0
+                self.finished.emit(self.report)
+
+# --- CIENIE ---
+class ShadowCache:
+    """Blurred rounded-rect shadows rendered once per (blur, radius, color) and drawn as a nine-patch."""
+    _pixmaps = {}
+
+    @classmethod
+    def pixmap(cls, blur, radius, color):
+        key = (blur, radius, color.rgba())
+        pm = cls._pixmaps.get(key)
+        if pm is None:
+            STATS["shadow_renders"] += 1
+            pm = cls._pixmaps[key] = cls._render(blur, radius, color)
+        return pm
+
+    @staticmethod
+    def _render(blur, radius, color):
+        size = 2 * (blur + radius) + 1
+        shape = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        shape.fill(Qt.transparent)
+        p = QPainter(shape)
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setPen(Qt.NoPen)
+        p.setBrush(color)
+        p.drawRoundedRect(QRectF(blur, blur, 2 * radius + 1, 2 * radius + 1), radius, radius)
+        p.end()
+        scene = QGraphicsScene()
+        item = QGraphicsPixmapItem(QPixmap.fromImage(shape))
+        effect = QGraphicsBlurEffect()
+        effect.setBlurRadius(blur)
+        item.setGraphicsEffect(effect)
+        scene.addItem(item)
+        out = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        out.fill(Qt.transparent)
+        p = QPainter(out)
+        scene.render(p, QRectF(0, 0, size, size), QRectF(0, 0, size, size))
+        p.end()
+        return QPixmap.fromImage(out)
+
+    @classmethod
+    def paint(cls, painter, rect, blur, radius, color, offset=(0, 0)):
+        """Shadow of the card occupying `rect` (QRectF): corners copied, edges and centre stretched."""
+        pm = cls.pixmap(blur, radius, color)
+        m, size = blur + radius, pm.width()
+        t = rect.adjusted(-blur, -blur, blur, blur).translated(*offset)
+        if t.width() < 2 * m or t.height() < 2 * m: return painter.drawPixmap(t, pm, QRectF(pm.rect()))
+        src = (0, m, m + 1, size)
+        xs = (t.left(), t.left() + m, t.right() - m, t.right())
+        ys = (t.top(), t.top() + m, t.bottom() - m, t.bottom())
+        for i in range(3):
+            for j in range(3):
+                painter.drawPixmap(QRectF(xs[i], ys[j], xs[i + 1] - xs[i], ys[j + 1] - ys[j]), pm,
+                                   QRectF(src[i], src[j], src[i + 1] - src[i], src[j + 1] - src[j]))
+
+class ShadowUnderlay(QWidget):
+    """Sibling painted just below `target` with a cached shadow, following its geometry, visibility and parent."""
+    def __init__(self, target, blur, radius, color, offset):
+        super().__init__(target.parentWidget())
+        self.target, self.blur, self.radius, self.color, self.offset = target, blur, radius, color, offset
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+        target.installEventFilter(self)
+        self._sync()
+
+    def _sync(self):
+        t = self.target
+        if self.parentWidget() is not t.parentWidget(): self.setParent(t.parentWidget())
+        pad = self.blur + max(map(abs, self.offset))
+        self.setGeometry(t.geometry().adjusted(-pad, -pad, pad, pad))
+        self.setVisible(t.parentWidget() is not None and t.isVisible())
+        if self.isVisible(): self.stackUnder(t)
+
+    def eventFilter(self, obj, e):
+        if e.type() in (QEvent.Move, QEvent.Resize, QEvent.Show, QEvent.Hide, QEvent.ParentChange, QEvent.ZOrderChange):
+            self._sync()
+        return False
+
+    def paintEvent(self, e):
+        pad = self.blur + max(map(abs, self.offset))
+        p = QPainter(self)
+        ShadowCache.paint(p, QRectF(self.rect().adjusted(pad, pad, -pad, -pad)), self.blur, self.radius, self.color, self.offset)
+
+def apply_shadow(widget, blur, color, offset=(0, 0), radius=16):
+    """Drop shadow according to SHADOW_MODE: cached underlay, QGraphicsDropShadowEffect or none."""
+    if SHADOW_MODE == "effect":
+        shadow = QGraphicsDropShadowEffect(widget)
+        shadow.setBlurRadius(blur)
+        shadow.setColor(color)
+        shadow.setOffset(*offset)
+        widget.setGraphicsEffect(shadow)
+        return shadow
+    if SHADOW_MODE == "cached":
+        return ShadowUnderlay(widget, blur // 2, radius, color, offset)   # blurRadius ~ 2 sigma of the effect
+    return None
+
+class FrameTimer:
+    """Times top-level UpdateRequest handling (paint of everything dirty) over a sliding window into STATS."""
+    def __init__(self, window=120):
+        self._times = deque(maxlen=window)
+
+    def measure(self, handler, e):
+        t0 = time.perf_counter()
+        result = handler(e)
+        self._times.append((time.perf_counter() - t0) * 1000)
+        STATS["frames"] += 1
+        if STATS["frames"] % 30 == 0:
+            ordered = sorted(self._times)
+            STATS["frame_ms_avg"] = round(sum(ordered) / len(ordered), 2)
+            STATS["frame_ms_p95"] = round(ordered[int(len(ordered) * 0.95) - 1], 2)
+        return result
+
+# --- MOTYW ---
+def compile_stylesheet():
+    """The whole application stylesheet for the current palette; widgets opt in via objectName / "role"."""
+    c = THEME.c
+    return f"""
+        QMainWindow {{ background-color: {c['bg_main']}; }}
+        QWidget {{ color: {c['text_main']}; }}
+        QLabel[role="title"] {{ font-size: 36px; font-weight: 900; color: {c['text_main']}; letter-spacing: -1px; }}
+        QLabel[role="subtitle"] {{ color: {c['text_muted']}; font-size: 14px; margin-left: 4px; }}
+        QLabel[role="section"] {{ font-size: 20px; font-weight: 700; color: {c['text_main']}; background: transparent; }}
+        QLabel[role="card-title"] {{ color: {c['text_main']}; font-size: 16px; font-weight: 700; }}
+        QLabel[role="label"] {{ color: {c['text_sub']}; font-size: 14px; font-weight: 600; }}
+        QLabel[role="caption"] {{ color: {c['text_muted']}; font-size: 12px; }}
+        QLabel[role="hint"] {{ color: {c['text_muted']}; font-size: 13px; }}
+        QLabel[role="info"] {{ color: {c['neon_cyan']}; font-size: 12px; margin-top: 8px; }}
+        QLabel[role="mono"] {{ color: {c['text_muted']}; font-size: 12px; font-family: 'Consolas', monospace; }}
+        QLabel[role="weekday"] {{ color: {c['text_muted']}; font-size: 12px; font-weight: 700; letter-spacing: 0.5px; }}
+        
+        CardWidget#Panel, CardWidget#PomodoroCard, CardWidget#CalendarCard, CardWidget#ChatCard {{
+            background-color: {c['bg_card']}; border: 1px solid rgba(255, 255, 255, 0.05); border-radius: 20px;
+        }}
+        CardWidget#Panel {{ border-radius: 16px; }}
+        CardWidget#CalendarCard QLabel {{ background: transparent; color: {c['text_main']}; }}
+        CardWidget#StatCard {{
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 {c['bg_card']}, stop:1 {c['bg_elevated']});
+            border: 1px solid rgba(255, 255, 255, 0.05); border-radius: 16px;
+        }}
+        CardWidget#StatCard:hover {{
+            border: 1px solid {c['accent']}40;
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 {c['bg_elevated']}, stop:1 {c['bg_card']});
+        }}
+        QWidget#StatIcon {{
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 {c['accent']}, stop:1 {c['accent_light']});
+            border-radius: 14px;
+        }}
+        QLabel#StatValue {{ font-size: 32px; color: {c['text_main']}; font-weight: 900; border: none; background: transparent; letter-spacing: -1px; }}
+        QLabel#StatTitle {{ color: {c['text_muted']}; font-size: 12px; font-weight: 600; text-transform: uppercase;
+                           border: none; background: transparent; letter-spacing: 0.5px; }}
+        QLabel#Lcd {{ font-size: 72px; font-weight: 800; color: {c['accent']}; background: transparent; letter-spacing: -2px; }}
+        
+        QScrollArea#Dashboard {{ background: transparent; border: none; }}
+        QWidget#DashboardView {{ background-color: {c['bg_main']}; }}
+        QLabel#RecentActivity {{ color: {c['text_muted']}; font-size: 13px; margin-top: -24px; }}
+        CardWidget#Banner {{
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 {c['accent']}, stop:0.5 {c['accent_light']}, stop:1 {c['neon_purple']});
+            border: none; border-radius: 20px;
+        }}
+        CardWidget#Banner QLabel {{ background: transparent; border: none; }}
+        QLabel#BannerTitle {{ color: white; font-size: 36px; font-weight: 900; letter-spacing: -1px; }}
+        QLabel#BannerText {{ color: rgba(255, 255, 255, 0.9); font-size: 16px; font-weight: 500; }}
+        
+        CardWidget#GenCard {{
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 {c['bg_card']}, stop:1 {c['bg_elevated']});
+            border: 1px solid rgba(255, 255, 255, 0.05); border-radius: 16px;
+        }}
+        QWidget#GenIcon {{
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 {c['neon_purple']}, stop:1 {c['accent_light']});
+            border-radius: 14px;
+        }}
+        QWidget#GenIcon QLabel {{ font-size: 28px; background: transparent; }}
+        QListView#NotesList {{ background-color: {c['bg_main']}; border: none; outline: none; }}
+        QLabel#EmptyIcon {{ color: {c['text_muted']}; font-size: 64px; }}
+        QLabel#EmptyText {{ color: {c['text_muted']}; font-size: 16px; font-weight: 600; }}
+        
+        QFrame#ViewerBar {{ background: {c['bg_card']}; border-bottom: 1px solid rgba(255, 255, 255, 0.05); }}
+        QLabel#DebugOverlay {{ background: {c['bg_elevated']}; color: {c['warning']}; font-size: 11px;
+                              font-family: 'Consolas', monospace; padding: 4px 8px; border-radius: 6px; }}
+        QDialog#DayEvents {{ background-color: {c['bg_card']}; }}
+        QDialog#DayEvents QLabel {{ color: {c['text_main']}; background: transparent; }}
+        QLabel#Placeholder {{ color: {c['text_muted']}; font-size: 16px; }}
+    """
+
+def styled(widget, name=None, role=None):
+    """Tag `widget` for the application stylesheet (objectName and/or "role" property)."""
+    if name: widget.setObjectName(name)
+    if role: widget.setProperty("role", role)
+    return widget
+
+class ThemeEngine(QObject):
+    """One compiled application stylesheet per palette, switched at runtime without rebuilding widgets.
+    `c` is the active palette (a PALETTES entry): read colours from it when painting or building a
+    sheet, never keep a copy across a switch. Painted widgets listen to `changed`; qfluentwidgets editors, whose own sheets outrank the application
+    sheet, are registered with local() and re-themed on the same switch."""
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.palette = BRANDS[BRAND]["palette"]
+        self.c = PALETTES[self.palette]
+        self._local = []
+
+    @property
+    def brand(self): return BRAND
+
+    def apply(self, palette=None, brand=None):
+        if brand:
+            set_brand(brand)
+            palette = palette or BRANDS[brand]["palette"]
+        if palette in PALETTES: self.palette = palette
+        self.c = PALETTES[self.palette]
+        t0 = time.perf_counter()
+        QApplication.instance().setStyleSheet(compile_stylesheet())
+        live = []
+        for widget, template in self._local:
+            try: widget.setStyleSheet(template())
+            except RuntimeError: continue   # widget already deleted
+            live.append((widget, template))
+        self._local = live
+        STATS["theme_apply_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        STATS["theme_switches"] += 1
+        self.changed.emit()
+
+    def local(self, widget, template):
+        """Per-widget sheet from `template()` (reads THEME.c), re-applied on every switch."""
+        widget.setStyleSheet(template())
+        self._local.append((widget, template))
+        return widget
+
+THEME = ThemeEngine()
 
 # --- ENHANCED UI COMPONENTS ---
 
 class AnimatedCard(CardWidget):
     """Card with hover animation and shadow"""
+    SHADOW_RADIUS = 16
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        
-        # Add shadow effect
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(20)
-        shadow.setColor(QColor(0, 0, 0, 80))
-        shadow.setOffset(0, 4)
-        self.setGraphicsEffect(shadow)
+        self._shadow = apply_shadow(self, 20, QColor(0, 0, 0, 80), (0, 4), self.SHADOW_RADIUS)
         
         self._default_style = ""
         self._hover_style = ""
@@ -115,34 +1786,16 @@ class StatCard(AnimatedCard):
     def __init__(self, icon, title, value, parent=None):
         super().__init__(parent)
         self.setFixedHeight(110)
-        self.setStyleSheet(f"""
-            CardWidget {{ 
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 {C_BG_CARD}, stop:1 {C_BG_ELEVATED});
-                border: 1px solid rgba(255, 255, 255, 0.05);
-                border-radius: 16px;
-            }}
-            CardWidget:hover {{
-                border: 1px solid {C_ACCENT}40;
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 {C_BG_ELEVATED}, stop:1 {C_BG_CARD});
-            }}
-        """)
+        self.setObjectName("StatCard")
         
         h = QHBoxLayout(self)
         h.setContentsMargins(24, 20, 24, 20)
         h.setSpacing(18)
         
         # Icon with gradient background
-        icon_container = QWidget()
+        icon_container = styled(QWidget(), "StatIcon")
+        icon_container.setAttribute(Qt.WA_StyledBackground)
         icon_container.setFixedSize(56, 56)
-        icon_container.setStyleSheet(f"""
-            QWidget {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 {C_ACCENT}, stop:1 {C_ACCENT_LIGHT});
-                border-radius: 14px;
-            }}
-        """)
         
         icon_layout = QVBoxLayout(icon_container)
         icon_layout.setContentsMargins(0, 0, 0, 0)
@@ -157,26 +1810,8 @@ class StatCard(AnimatedCard):
         v.setSpacing(4)
         v.setAlignment(Qt.AlignVCenter)
         
-        self.val_lbl = QLabel(str(value), self)
-        self.val_lbl.setStyleSheet(f"""
-            font-size: 32px; 
-            color: {C_TEXT_MAIN}; 
-            font-weight: 900; 
-            border: none; 
-            background: transparent;
-            letter-spacing: -1px;
-        """)
-        
-        self.title_lbl = QLabel(title, self)
-        self.title_lbl.setStyleSheet(f"""
-            color: {C_TEXT_MUTED}; 
-            font-size: 12px; 
-            font-weight: 600; 
-            text-transform: uppercase; 
-            border: none; 
-            background: transparent;
-            letter-spacing: 0.5px;
-        """)
+        self.val_lbl = styled(QLabel(str(value), self), "StatValue")
+        self.title_lbl = styled(QLabel(title, self), "StatTitle")
         
         v.addWidget(self.val_lbl)
         v.addWidget(self.title_lbl)
@@ -189,16 +1824,12 @@ class StatCard(AnimatedCard):
         self.val_lbl.setText(str(val))
 
 class PomodoroCard(AnimatedCard):
+    SHADOW_RADIUS = 20
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedSize(380, 460)
-        self.setStyleSheet(f"""
-            CardWidget {{ 
-                background-color: {C_BG_CARD}; 
-                border: 1px solid rgba(255, 255, 255, 0.05); 
-                border-radius: 20px; 
-            }}
-        """)
+        self.setObjectName("PomodoroCard")
         
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_timer)
@@ -209,8 +1840,7 @@ class PomodoroCard(AnimatedCard):
         l.setContentsMargins(32, 32, 32, 32)
         l.setSpacing(24)
         
-        header = QLabel("⏱️ Sesja Skupienia", self)
-        header.setStyleSheet(f"color: {C_TEXT_MAIN}; font-size: 20px; font-weight: 700; background: transparent;")
+        header = styled(QLabel("⏱️ Sesja Skupienia", self), role="section")
         l.addWidget(header)
         
         # Circular progress container
@@ -220,15 +1850,8 @@ class PomodoroCard(AnimatedCard):
         pc_layout.setContentsMargins(0, 0, 0, 0)
         pc_layout.setAlignment(Qt.AlignCenter)
         
-        self.lcd = QLabel("25:00", self)
+        self.lcd = styled(QLabel("25:00", self), "Lcd")
         self.lcd.setAlignment(Qt.AlignCenter)
-        self.lcd.setStyleSheet(f"""
-            font-size: 72px; 
-            font-weight: 800; 
-            color: {C_ACCENT};
-            background: transparent;
-            letter-spacing: -2px;
-        """)
         pc_layout.addWidget(self.lcd)
         
         l.addWidget(progress_container, 0, Qt.AlignCenter)
@@ -237,12 +1860,7 @@ class PomodoroCard(AnimatedCard):
         self.prog.setRange(0, 25*60)
         self.prog.setValue(0)
         self.prog.setFixedHeight(6)
-        self.prog.setStyleSheet(f"""
-            ProgressBar {{
-                background-color: {C_BG_ELEVATED};
-                border-radius: 3px;
-            }}
-        """)
+        THEME.local(self.prog, lambda: f"ProgressBar {{ background-color: {THEME.c['bg_elevated']}; border-radius: 3px; }}")
         l.addWidget(self.prog)
         
         l.addSpacing(8)
@@ -300,42 +1918,135 @@ class PomodoroCard(AnimatedCard):
         s = self.time_left % 60
         self.lcd.setText(f"{m:02d}:{s:02d}")
 
+class MonthView(QWidget):
+    """Painted month grid: one paintEvent and hit testing instead of 42 buttons, day-number glyphs laid out once."""
+    day_clicked = pyqtSignal(int)
+    CELL = 48
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.setCursor(Qt.PointingHandCursor)
+        self.setMinimumSize(7 * (self.CELL + 6), 6 * (self.CELL + 6))
+        self._font = QFont(self.font())
+        self._font.setPixelSize(14)
+        self._font.setWeight(QFont.DemiBold)
+        self._bold = QFont(self._font)
+        self._bold.setWeight(QFont.ExtraBold)
+        self._glyphs = {}    # (day, bold) -> prepared QStaticText
+        self._weeks = []
+        self._events = {}
+        self._today = 0
+        self._hover = 0
+        self._rects = {}
+        self.update_palette()
+        THEME.changed.connect(self.update_palette)
+
+    KIND_ORDER = ("exam", "deadline", "study", "note")   # the first kind present colours the cell
+
+    def update_palette(self):
+        c = THEME.c
+        self._c = {"text": QColor(c["text_sub"]), "hover_text": QColor(c["text_main"]), "hover": QColor(c["bg_elevated"]),
+                   "accent": QColor(c["accent"]), "accent2": QColor(c["accent_light"]), "white": QColor("white")}
+        kinds = {"exam": "#f87171", "deadline": c["warning"], "study": c["success"], "note": c["accent"]}
+        self._kind = {}
+        for k, color in kinds.items():
+            fg, bg = QColor(color), QColor(color)
+            bg.setAlpha(0x20)
+            self._kind[k] = (fg, bg, QPen(fg, 2))
+        self.update()
+
+    def set_month(self, year, month, events, today=0):
+        """`events` maps day -> [event]; `today` is the day number to highlight (0 = not this month)."""
+        self._weeks = calendar.monthcalendar(year, month)
+        self._events = events
+        self._today = today
+        self._hover = 0
+        self._layout()
+        self.update()
+
+    def _layout(self):
+        cw, rh = self.width() / 7, self.height() / 6
+        size = min(self.CELL, cw - 6, rh - 6)
+        self._rects = {day: QRectF(c * cw + (cw - size) / 2, r * rh + (rh - size) / 2, size, size)
+                       for r, week in enumerate(self._weeks) for c, day in enumerate(week) if day}
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self._layout()
+
+    def day_at(self, pos):
+        r, c = int(pos.y() * 6 // max(1, self.height())), int(pos.x() * 7 // max(1, self.width()))
+        if not (0 <= r < len(self._weeks) and 0 <= c < 7): return 0
+        day = self._weeks[r][c]
+        return day if day and self._rects[day].contains(QPointF(pos)) else 0
+
+    def _glyph(self, day, bold):
+        g = self._glyphs.get((day, bold))
+        if g is None:
+            g = self._glyphs[(day, bold)] = QStaticText(str(day))
+            g.prepare(QTransform(), self._bold if bold else self._font)
+        return g
+
+    def paintEvent(self, e):
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing)
+        c = self._c
+        for day, rect in self._rects.items():
+            if not e.rect().intersects(rect.toAlignedRect()): continue
+            today = day == self._today
+            if today:
+                grad = QLinearGradient(rect.topLeft(), rect.bottomRight())
+                grad.setColorAt(0, c["accent"]); grad.setColorAt(1, c["accent2"])
+                p.setPen(Qt.NoPen); p.setBrush(grad); fg = c["white"]
+            elif day in self._events:
+                kinds = {ev.get("kind") for ev in self._events[day]}
+                fg, bg, pen = self._kind[next((k for k in self.KIND_ORDER if k in kinds), "note")]
+                p.setPen(pen); p.setBrush(bg)
+            elif day == self._hover:
+                p.setPen(Qt.NoPen); p.setBrush(c["hover"]); fg = c["hover_text"]
+            else:
+                fg = c["text"]
+            if fg is not c["text"]: p.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 8, 8)
+            g = self._glyph(day, today)
+            p.setFont(self._bold if today else self._font)
+            p.setPen(fg)
+            size = g.size()
+            p.drawStaticText(QPointF(rect.center().x() - size.width() / 2, rect.center().y() - size.height() / 2), g)
+
+    def mouseMoveEvent(self, e):
+        day = self.day_at(e.pos())
+        if day != self._hover:
+            for d in (self._hover, day):
+                if d: self.update(self._rects[d].toAlignedRect())
+            self._hover = day
+
+    def leaveEvent(self, e):
+        if self._hover: self.update(self._rects[self._hover].toAlignedRect())
+        self._hover = 0
+        super().leaveEvent(e)
+
+    def mouseReleaseEvent(self, e):
+        day = self.day_at(e.pos())
+        if e.button() == Qt.LeftButton and day: self.day_clicked.emit(day)
+
+    def event(self, e):
+        if e.type() == QEvent.ToolTip:
+            events = self._events.get(self.day_at(e.pos()))
+            text = "\n".join(f"{EVENT_KINDS.get(ev.get('kind'), EVENT_KINDS['note'])[0]} {ev['title']}" for ev in events or ())
+            if text: QToolTip.showText(e.globalPos(), text, self)
+            else: QToolTip.hideText()
+            return True
+        return super().event(e)
+
 class InteractiveCalendar(AnimatedCard):
+    SHADOW_RADIUS = 20
+
     def __init__(self, parent_app, parent=None):
         super().__init__(parent)
         self.parent_app = parent_app
         self.setFixedSize(520, 460)
         self.setObjectName("CalendarCard")
-        self.setStyleSheet(f"""
-            CardWidget {{ 
-                background-color: {C_BG_CARD}; 
-                border: 1px solid rgba(255, 255, 255, 0.05); 
-                border-radius: 20px; 
-            }}
-            QPushButton#DayBtn {{ 
-                background: transparent; 
-                border-radius: 8px; 
-                color: {C_TEXT_SUB}; 
-                font-weight: 600; 
-                font-size: 14px;
-            }}
-            QPushButton#DayBtn:hover {{ 
-                background-color: {C_BG_ELEVATED}; 
-                color: {C_TEXT_MAIN};
-            }}
-            QPushButton#DayBtn[hasNote="true"] {{ 
-                background-color: {C_ACCENT}20;
-                border: 2px solid {C_ACCENT}; 
-                color: {C_ACCENT};
-            }}
-            QPushButton#DayBtn[isToday="true"] {{ 
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 {C_ACCENT}, stop:1 {C_ACCENT_LIGHT});
-                color: white;
-                font-weight: 800;
-            }}
-            QLabel {{ background: transparent; color: {C_TEXT_MAIN}; }}
-        """)
         
         self.current_date = date.today()
         self.displayed_date = self.current_date
@@ -345,8 +2056,7 @@ class InteractiveCalendar(AnimatedCard):
         layout.setSpacing(16)
         
         header = QHBoxLayout()
-        self.lbl_month = QLabel()
-        self.lbl_month.setStyleSheet(f"font-size: 20px; font-weight: 700; color: {C_TEXT_MAIN};")
+        self.lbl_month = styled(QLabel(), role="section")
         
         btn_prev = TransparentToolButton(FluentIcon.LEFT_ARROW, self)
         btn_prev.clicked.connect(self.prev_month)
@@ -363,54 +2073,24 @@ class InteractiveCalendar(AnimatedCard):
         
         days_layout = QHBoxLayout()
         for d in ["Pn", "Wt", "Śr", "Cz", "Pt", "So", "Nd"]:
-            l = QLabel(d)
+            l = styled(QLabel(d), role="weekday")
             l.setAlignment(Qt.AlignCenter)
-            l.setStyleSheet(f"color: {C_TEXT_MUTED}; font-size: 12px; font-weight: 700; letter-spacing: 0.5px;")
             days_layout.addWidget(l)
         layout.addLayout(days_layout)
         
-        self.grid = QGridLayout()
-        self.grid.setSpacing(6)
-        layout.addLayout(self.grid)
+        self.month = MonthView(self)
+        self.month.day_clicked.connect(self.on_day_clicked)
+        layout.addWidget(self.month)
         
         self.refresh_calendar()
 
     def refresh_calendar(self):
-        for i in reversed(range(self.grid.count())): 
-            self.grid.itemAt(i).widget().setParent(None)
-            
         month_names = ["", "Styczeń", "Luty", "Marzec", "Kwiecień", "Maj", "Czerwiec", 
                        "Lipiec", "Sierpień", "Wrzesień", "Październik", "Listopad", "Grudzień"]
-        self.lbl_month.setText(f"{month_names[self.displayed_date.month]} {self.displayed_date.year}")
-        
-        cal = calendar.monthcalendar(self.displayed_date.year, self.displayed_date.month)
-        calendar_notes = self.parent_app.data.get("calendar_notes", {})
-        
-        for row, week in enumerate(cal):
-            for col, day in enumerate(week):
-                if day != 0:
-                    btn = QPushButton(str(day))
-                    btn.setObjectName("DayBtn")
-                    btn.setFixedSize(48, 48)
-                    btn.setCursor(Qt.PointingHandCursor)
-                    
-                    is_today = (day == self.current_date.day and 
-                                self.displayed_date.month == self.current_date.month and 
-                                self.displayed_date.year == self.current_date.year)
-                    btn.setProperty("isToday", is_today)
-                    
-                    note_key = f"{self.displayed_date.year}-{self.displayed_date.month:02d}-{day:02d}"
-                    has_note = note_key in calendar_notes
-                    btn.setProperty("hasNote", has_note)
-                    if has_note:
-                        btn.setToolTip(f"📝 {calendar_notes[note_key]}")
-                    
-                    btn.clicked.connect(lambda _, d=day: self.on_day_clicked(d))
-                    
-                    btn.style().unpolish(btn)
-                    btn.style().polish(btn)
-                    
-                    self.grid.addWidget(btn, row, col)
+        y, m = self.displayed_date.year, self.displayed_date.month
+        self.lbl_month.setText(f"{month_names[m]} {y}")
+        today = self.current_date.day if (y, m) == (self.current_date.year, self.current_date.month) else 0
+        self.month.set_month(y, m, self.parent_app.calendar.month(y, m), today)
 
     def prev_month(self):
         month = self.displayed_date.month - 1
@@ -431,117 +2111,232 @@ class InteractiveCalendar(AnimatedCard):
         self.refresh_calendar()
 
     def on_day_clicked(self, day):
-        note_key = f"{self.displayed_date.year}-{self.displayed_date.month:02d}-{day:02d}"
-        notes = self.parent_app.data.get("calendar_notes", {})
-        current_note = notes.get(note_key, "")
-        
-        text, ok = QInputDialog.getText(self, f"Notatka: {day}/{self.displayed_date.month}", 
-                                      "Wpisz wydarzenie/zadanie:", text=current_note)
-        if ok:
-            if "calendar_notes" not in self.parent_app.data:
-                self.parent_app.data["calendar_notes"] = {}
-                
-            if text.strip():
-                self.parent_app.data["calendar_notes"][note_key] = text
-            else:
-                if note_key in self.parent_app.data["calendar_notes"]:
-                    del self.parent_app.data["calendar_notes"][note_key]
-            
-            self.parent_app.save_data()
-            self.refresh_calendar()
+        DayEventsDialog(self.parent_app, date(self.displayed_date.year, self.displayed_date.month, day), self.window()).exec_()
+        self.refresh_calendar()
+
+def note_icon(subj, name):
+    icn_char = "📝"
+    if "fiz" in subj.lower(): icn_char = "⚛️"
+    elif "mat" in subj.lower(): icn_char = "📐"
+    elif "py" in subj.lower(): icn_char = "🐍"
+    elif "sys" in subj.lower() or "os" in subj.lower() or "linux" in subj.lower(): icn_char = "🐧"
+    elif "prog" in subj.lower() or "dev" in subj.lower() or "cpp" in subj.lower() or "java" in subj.lower(): icn_char = "🚀"
+    elif "baz" in subj.lower() or "sql" in subj.lower() or "data" in subj.lower(): icn_char = "🗄️"
+    elif "siec" in subj.lower() or "net" in subj.lower(): icn_char = "🌐"
+    elif any(k in subj.lower() for k in AI_SUBJECTS): icn_char = "🧠"
+    
+    if "CWICZENIA" in name: icn_char = "🏋️"
+    return icn_char
+
+NoteRow = namedtuple("NoteRow", "kind subj name path")   # kind: "header" | "note"
+
+class NotesModel(QAbstractListModel):
+    """Flat list of subject blocks (header + notes); set_rows() / set_subject() emit only the rows that changed."""
+    RowRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self.counts = {}   # subj -> Counter(notes=.., exercises=..)
+        self._order, self._sizes = [], {}   # subject block order and lengths, to find a block without a scan
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid(): return None
+        row = self._rows[index.row()]
+        if role == self.RowRole: return row
+        if role == Qt.DisplayRole: return row.name or row.subj
+        if role == Qt.ToolTipRole and row.kind == "note": return row.path
+        return None
+
+    def flags(self, index):
+        if not index.isValid(): return Qt.NoItemFlags
+        if self._rows[index.row()].kind == "header": return Qt.ItemIsEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def set_rows(self, rows):
+        old_counts, self.counts = self.counts, self._count(rows)
+        self._splice(0, len(self._rows), rows, old_counts)
+        self._order, self._sizes = [], {}
+        for r in rows:
+            if r.kind == "header": self._order.append(r.subj)
+            self._sizes[r.subj] = self._sizes.get(r.subj, 0) + 1
+
+    def set_subject(self, subj, rows):
+        """Replace the block of one subject (its header + notes, or [] to drop it); cost is O(block)."""
+        if subj not in self._sizes:
+            if not rows: return
+            self._order.append(subj); self._sizes[subj] = 0
+        start = 0
+        for s in self._order:
+            if s == subj: break
+            start += self._sizes[s]
+        old_counts = {subj: self.counts.pop(subj, None)}
+        self.counts.update(self._count(rows))
+        self._splice(start, start + self._sizes[subj], rows, old_counts)
+        if rows: self._sizes[subj] = len(rows)
+        else:
+            self._order.remove(subj); del self._sizes[subj]
+
+    def _splice(self, lo, hi, rows, old_counts):
+        """Turn self._rows[lo:hi] into `rows` with minimal insert/remove/dataChanged signals."""
+        key = lambda r: (r.kind, r.subj, r.name)
+        ops = difflib.SequenceMatcher(None, [key(r) for r in self._rows[lo:hi]], [key(r) for r in rows], autojunk=False).get_opcodes()
+        for tag, i1, i2, j1, j2 in reversed(ops):
+            i1, i2 = i1 + lo, i2 + lo
+            if tag == "equal":
+                for off in range(i2 - i1):
+                    if self._rows[i1 + off] != rows[j1 + off] or (
+                            rows[j1 + off].kind == "header" and old_counts.get(rows[j1 + off].subj) != self.counts.get(rows[j1 + off].subj)):
+                        self._rows[i1 + off] = rows[j1 + off]
+                        self.dataChanged.emit(self.index(i1 + off), self.index(i1 + off))
+                continue
+            if i2 > i1:
+                self.beginRemoveRows(QModelIndex(), i1, i2 - 1)
+                del self._rows[i1:i2]
+                self.endRemoveRows()
+            if j2 > j1:
+                self.beginInsertRows(QModelIndex(), i1, i1 + j2 - j1 - 1)
+                self._rows[i1:i1] = rows[j1:j2]
+                self.endInsertRows()
+
+    @staticmethod
+    def _count(rows):
+        counts = {}
+        for r in rows:
+            if r.kind == "note":
+                counts.setdefault(r.subj, Counter())["exercises" if "CWICZENIA_" in r.name else "notes"] += 1
+        return counts
+
+class NotesFilterProxy(QSortFilterProxyModel):
+    """Pivot (notes/exercises) and search filtering; ranks by score while a query is active."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.show_exercises = False
+        self.query = ""
+        self.scores = {}
+        self.setDynamicSortFilter(True)
+
+    def set_filter(self, show_exercises, query="", hits=None):
+        self.show_exercises = show_exercises
+        self.query = fold(query).strip()
+        self.scores = {}
+        if self.query:
+            model = self.sourceModel()
+            for i in range(model.rowCount()):
+                r = model.data(model.index(i), NotesModel.RowRole)
+                if r.kind != "note": continue
+                score = (hits or {}).get(r.path, 0) + (100 if self.query in fold(r.name) or self.query in fold(r.subj) else 0)
+                if score > 0: self.scores[r.path] = score
+        self.invalidateFilter()
+        if self.query: self.sort(0, Qt.DescendingOrder)
+        else: self.sort(-1)
 
-class NoteListItem(AnimatedCard):
+    def filterAcceptsRow(self, src_row, src_parent):
+        model = self.sourceModel()
+        r = model.data(model.index(src_row), NotesModel.RowRole)
+        if r.kind == "header":
+            return not self.query and model.counts.get(r.subj, {}).get("exercises" if self.show_exercises else "notes", 0) > 0
+        if ("CWICZENIA_" in r.name) != self.show_exercises: return False
+        return not self.query or r.path in self.scores
+
+    def lessThan(self, left, right):
+        return (self.scores.get(left.data(NotesModel.RowRole).path, 0) <
+                self.scores.get(right.data(NotesModel.RowRole).path, 0))
+
+class NoteCardDelegate(QStyledItemDelegate):
+    """Paints the note card look (icon, title, subject, delete, arrow) for visible rows only."""
     note_clicked = pyqtSignal(str, str, str)
     delete_clicked = pyqtSignal(str, str, str)
     
-    def __init__(self, name, subj, path, parent=None):
+    CARD_H, GAP, HEADER_H = 90, 14, 60
+    SHADOW_BLUR, SHADOW_DY = 6, 3   # the card is inset so blur + offset stay inside its own row (GAP >= blur + dy)
+
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.setFixedHeight(90)
-        self.setCursor(Qt.PointingHandCursor)
-        self.path = path; self.subj = subj; self.name = name
-        
-        self.setStyleSheet(f"""
-            CardWidget {{ 
-                background-color: {C_BG_CARD}; 
-                border: 1px solid rgba(255, 255, 255, 0.05); 
-                border-radius: 12px; 
-            }}
-            CardWidget:hover {{ 
-                background-color: {C_BG_ELEVATED}; 
-                border: 1px solid {C_ACCENT}40; 
-                transform: translateY(-2px);
-            }}
-        """)
-        
-        l = QHBoxLayout(self)
-        l.setContentsMargins(24, 16, 24, 16)
-        l.setSpacing(20)
-        
-        icn_char = "📝"
-        if "fiz" in subj.lower(): icn_char = "⚛️"
-        elif "mat" in subj.lower(): icn_char = "📐"
-        elif "py" in subj.lower(): icn_char = "🐍"
-        elif "sys" in subj.lower() or "os" in subj.lower() or "linux" in subj.lower(): icn_char = "🐧"
-        elif "prog" in subj.lower() or "dev" in subj.lower() or "cpp" in subj.lower() or "java" in subj.lower(): icn_char = "🚀"
-        elif "baz" in subj.lower() or "sql" in subj.lower() or "data" in subj.lower(): icn_char = "🗄️"
-        elif "siec" in subj.lower() or "net" in subj.lower(): icn_char = "🌐"
-        elif "machine" in subj.lower() or "ml" in subj.lower() or "ai" in subj.lower(): icn_char = "🧠"
-        
-        if "CWICZENIA" in name: icn_char = "🏋️"
-        
-        # Icon with background
-        icon_container = QWidget()
-        icon_container.setFixedSize(56, 56)
-        icon_container.setStyleSheet(f"""
-            QWidget {{
-                background-color: {C_BG_ELEVATED};
-                border-radius: 12px;
-            }}
-        """)
-        
-        ic_layout = QVBoxLayout(icon_container)
-        ic_layout.setContentsMargins(0, 0, 0, 0)
-        ic_layout.setAlignment(Qt.AlignCenter)
-        
-        lbl_icn = QLabel(icn_char)
-        lbl_icn.setStyleSheet("font-size: 28px; background: transparent; border: none;")
-        ic_layout.addWidget(lbl_icn)
-        
-        txt_lay = QVBoxLayout()
-        txt_lay.setAlignment(Qt.AlignVCenter)
-        txt_lay.setSpacing(6)
-        
-        display_name = name.replace("CWICZENIA_", "Ćw: ").replace(".html", "")
-        t = QLabel(display_name, self)
-        t.setStyleSheet(f"font-weight: 700; font-size: 16px; color: {C_TEXT_MAIN}; background: transparent; border: none;")
-        
-        s = QLabel(subj.upper(), self)
-        s.setStyleSheet(f"color: {C_NEON_CYAN}; font-weight: 700; font-size: 11px; letter-spacing: 1px; background: transparent; border: none;")
-        
-        txt_lay.addWidget(t)
-        txt_lay.addWidget(s)
-        
-        btn_del = TransparentToolButton(FluentIcon.DELETE, self)
-        btn_del.setCursor(Qt.PointingHandCursor)
-        btn_del.setStyleSheet("background: transparent; border: none;")
-        btn_del.clicked.connect(self._emit_delete)
-        
-        arrow = QLabel("›")
-        arrow.setStyleSheet(f"font-size: 28px; color: {C_ACCENT}; font-weight: 300; background: transparent; border: none;")
-        
-        l.addWidget(icon_container)
-        l.addLayout(txt_lay, 1)
-        l.addWidget(btn_del)
-        l.addSpacing(10)
-        l.addWidget(arrow)
+        self.del_icon = FluentIcon.DELETE.icon(color=QColor(THEME.c["text_sub"]))
+        THEME.changed.connect(lambda: setattr(self, "del_icon", FluentIcon.DELETE.icon(color=QColor(THEME.c["text_sub"]))))
+        self.f_title = QFont(); self.f_title.setPixelSize(16); self.f_title.setWeight(QFont.Bold)
+        self.f_subj = QFont(); self.f_subj.setPixelSize(11); self.f_subj.setWeight(QFont.Bold)
+        self.f_subj.setLetterSpacing(QFont.AbsoluteSpacing, 1)
+        self.f_header = QFont(); self.f_header.setPixelSize(13); self.f_header.setWeight(QFont.Bold)
+        self.f_header.setLetterSpacing(QFont.AbsoluteSpacing, 1.5)
+        self.f_icon = QFont(); self.f_icon.setPixelSize(28)
+        self.f_arrow = QFont(); self.f_arrow.setPixelSize(28); self.f_arrow.setWeight(QFont.Light)
+        self.shadow_color = QColor(0, 0, 0, 70)
 
-    def mouseReleaseEvent(self, e):
-        if not self.childAt(e.pos()) or not isinstance(self.childAt(e.pos()), TransparentToolButton):
-            super().mouseReleaseEvent(e)
-            self.note_clicked.emit(self.path, self.subj, self.name)
+    def sizeHint(self, option, index):
+        r = index.data(NotesModel.RowRole)
+        return QSize(option.rect.width(), self.HEADER_H if r.kind == "header" else self.CARD_H + self.GAP)
+
+    def _card_rect(self, rect):
+        b = self.SHADOW_BLUR
+        return QRectF(rect.adjusted(b, b - self.SHADOW_DY, -b, -self.GAP))
+
+    def _delete_rect(self, rect):
+        card = self._card_rect(rect)
+        return QRect(int(card.right()) - 24 - 28 - 10 - 32, int(card.center().y()) - 16, 32, 32)
 
-    def _emit_delete(self):
-        self.delete_clicked.emit(self.path, self.subj, self.name)
+    def paint(self, painter, option, index):
+        r = index.data(NotesModel.RowRole)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        if r.kind == "header":
+            painter.setFont(self.f_header)
+            painter.setPen(QColor(THEME.c["text_muted"]))
+            painter.drawText(option.rect.adjusted(12, 32, 0, -4), Qt.AlignLeft | Qt.AlignBottom, r.subj.upper())
+            painter.restore()
+            return
+        
+        hover = bool(option.state & QStyle.State_MouseOver)
+        selected = bool(option.state & QStyle.State_Selected)
+        card = self._card_rect(option.rect)
+        if SHADOW_MODE != "off": ShadowCache.paint(painter, card, self.SHADOW_BLUR, 12, self.shadow_color, (0, self.SHADOW_DY))
+        border = QColor(THEME.c["accent"]) if selected or hover else QColor(255, 255, 255, 13)
+        if hover and not selected: border.setAlpha(0x40)
+        painter.setPen(QPen(border, 1))
+        painter.setBrush(QColor(THEME.c["bg_elevated"] if hover or selected else THEME.c["bg_card"]))
+        painter.drawRoundedRect(card.adjusted(0.5, 0.5, -0.5, -0.5), 12, 12)
+        
+        icon_box = QRectF(card.left() + 24, card.center().y() - 28, 56, 56)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(THEME.c["bg_elevated"] if not hover else THEME.c["bg_card"]))
+        painter.drawRoundedRect(icon_box, 12, 12)
+        painter.setFont(self.f_icon)
+        painter.setPen(QColor(THEME.c["text_main"]))
+        painter.drawText(icon_box, Qt.AlignCenter, note_icon(r.subj, r.name))
+        
+        text_left = icon_box.right() + 20
+        del_rect = self._delete_rect(option.rect)
+        text_w = del_rect.left() - 20 - text_left
+        painter.setFont(self.f_title)
+        painter.setPen(QColor(THEME.c["text_main"]))
+        display_name = r.name.replace("CWICZENIA_", "Ćw: ").replace(".html", "")
+        title = painter.fontMetrics().elidedText(display_name, Qt.ElideRight, int(text_w))
+        painter.drawText(QRectF(text_left, card.center().y() - 24, text_w, 24), Qt.AlignLeft | Qt.AlignBottom, title)
+        painter.setFont(self.f_subj)
+        painter.setPen(QColor(THEME.c["neon_cyan"]))
+        painter.drawText(QRectF(text_left, card.center().y() + 6, text_w, 18), Qt.AlignLeft | Qt.AlignTop, r.subj.upper())
+        
+        self.del_icon.paint(painter, del_rect.adjusted(8, 8, -8, -8))
+        painter.setFont(self.f_arrow)
+        painter.setPen(QColor(THEME.c["accent"]))
+        painter.drawText(QRectF(card.right() - 24 - 28, card.top(), 28, card.height()), Qt.AlignCenter, "›")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        r = index.data(NotesModel.RowRole)
+        if r.kind != "note" or event.type() != QEvent.MouseButtonRelease or event.button() != Qt.LeftButton:
+            return False
+        if event.modifiers() & (Qt.ControlModifier | Qt.ShiftModifier): return False
+        if self._delete_rect(option.rect).contains(event.pos()):
+            self.delete_clicked.emit(r.path, r.subj, r.name)
+        elif self._card_rect(option.rect).contains(event.pos()):
+            self.note_clicked.emit(r.path, r.subj, r.name)
+        return True
 
 # --- ZAKŁADKI ---
 
@@ -555,30 +2350,16 @@ class DashboardInterface(ScrollArea):
         self.parent_app = parent_app
         self.setObjectName("Dashboard")
         
-        self.setStyleSheet(f"QScrollArea {{ background: transparent; border: none; }} QWidget#DashboardView {{ background-color: {C_BG_MAIN}; }}")
-        
         l = QVBoxLayout(self.view)
         l.setContentsMargins(48, 48, 48, 48)
         l.setSpacing(40)
         
         # Enhanced Banner with gradient
-        self.banner = CardWidget(self)
+        self.banner = styled(CardWidget(self), "Banner")
         self.banner.setFixedHeight(180)
-        self.banner.setStyleSheet(f"""
-            CardWidget {{ 
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 {C_ACCENT}, stop:0.5 {C_ACCENT_LIGHT}, stop:1 {C_NEON_PURPLE});
-                border: none; 
-                border-radius: 20px; 
-            }}
-        """)
         
         # Add subtle shadow
-        banner_shadow = QGraphicsDropShadowEffect(self.banner)
-        banner_shadow.setBlurRadius(30)
-        banner_shadow.setColor(QColor(99, 102, 241, 100))
-        banner_shadow.setOffset(0, 8)
-        self.banner.setGraphicsEffect(banner_shadow)
+        apply_shadow(self.banner, 30, QColor(99, 102, 241, 100), (0, 8), 20)
         
         bl = QHBoxLayout(self.banner)
         bl.setContentsMargins(48, 0, 48, 0)
@@ -586,13 +2367,10 @@ class DashboardInterface(ScrollArea):
         cap_icon = FluentIcon.EDUCATION.icon(color=QColor("white"))
         img_lbl = QLabel()
         img_lbl.setPixmap(cap_icon.pixmap(72, 72))
-        img_lbl.setStyleSheet("background: transparent; border: none;")
         
         txt = QVBoxLayout(); txt.setAlignment(Qt.AlignVCenter); txt.setSpacing(8)
-        w = QLabel("Witaj Inżynierze!", self.banner)
-        w.setStyleSheet("color: white; font-size: 36px; font-weight: 900; background: transparent; border: none; letter-spacing: -1px;")
-        d = QLabel("Twoje Centrum Nauki jest gotowe. Otwórz notatki i zacznij działać.", self.banner)
-        d.setStyleSheet("color: rgba(255, 255, 255, 0.9); font-size: 16px; background: transparent; border: none; font-weight: 500;")
+        w = styled(QLabel("Witaj Inżynierze!", self.banner), "BannerTitle")
+        d = styled(QLabel("Twoje Centrum Nauki jest gotowe. Otwórz notatki i zacznij działać.", self.banner), "BannerText")
         txt.addWidget(w); txt.addWidget(d)
         
         bl.addWidget(img_lbl); bl.addSpacing(28); bl.addLayout(txt); bl.addStretch()
@@ -611,6 +2389,9 @@ class DashboardInterface(ScrollArea):
         stats_lay.addWidget(self.stat_exer)
         l.addLayout(stats_lay)
         
+        self.recent_lbl = styled(QLabel("", self), "RecentActivity")
+        l.addWidget(self.recent_lbl)
+        
         # Content with better spacing
         content = QHBoxLayout()
         content.setSpacing(32)
@@ -619,8 +2400,7 @@ class DashboardInterface(ScrollArea):
         list_con.setSpacing(20)
         list_con.setAlignment(Qt.AlignTop) 
         
-        st = QLabel("📅 Kalendarz", self)
-        st.setStyleSheet(f"font-size: 20px; font-weight: 700; color: {C_TEXT_MAIN}; margin-bottom: 8px;")
+        st = styled(QLabel("📅 Kalendarz", self), role="section")
         list_con.addWidget(st)
         
         self.calendar = InteractiveCalendar(self.parent_app)
@@ -630,8 +2410,7 @@ class DashboardInterface(ScrollArea):
         chart_con.setAlignment(Qt.AlignTop)
         chart_con.setSpacing(20)
         
-        pom_label = QLabel("⏱️ Produktywność", self)
-        pom_label.setStyleSheet(f"font-size: 20px; font-weight: 700; color: {C_TEXT_MAIN}; margin-bottom: 8px;")
+        pom_label = styled(QLabel("⏱️ Produktywność", self), role="section")
         chart_con.addWidget(pom_label)
         
         self.pomodoro = PomodoroCard()
@@ -642,20 +2421,20 @@ class DashboardInterface(ScrollArea):
         l.addLayout(content)
 
     def refresh(self):
-        data = self.parent_app.data.get("subjects", {})
-        
-        n_notes = 0
-        n_exer = 0
-        for s, notes in data.items():
-            for n in notes:
-                if "CWICZENIA_" in n: n_exer += 1
-                else: n_notes += 1
-                
-        self.stat_notes.set_value(n_notes)
-        self.stat_subjs.set_value(len(data))
-        self.stat_exer.set_value(n_exer)
-        
-        self.calendar.refresh_calendar()
+        """O(1): reads the incremental aggregates; the calendar repaints itself on edits, here only on a new day."""
+        data = self.parent_app.data
+        st = data["stats"]
+        self.stat_notes.set_value(st["notes"])
+        self.stat_subjs.set_value(len(data["subjects"]))
+        self.stat_exer.set_value(st["exercises"])
+        
+        added = [name.replace(".html", "") for _, op, _, name in st["recent"][:12] if op == "add"][:3]
+        self.recent_lbl.setText(f"🕘 Ostatnio dodane: {' · '.join(added)}" if added else "")
+        self.recent_lbl.setVisible(bool(added))
+        
+        if self.calendar.current_date != date.today():
+            self.calendar.current_date = date.today()
+            self.calendar.refresh_calendar()
 
 class NotesInterface(QWidget):
     def __init__(self, parent_app):
@@ -669,8 +2448,8 @@ class NotesInterface(QWidget):
         
         # Enhanced Header
         top_bar = QHBoxLayout()
-        tl = TitleLabel("Notatki & Ćwiczenia", self)
-        tl.setStyleSheet(f"font-size: 36px; font-weight: 900; color: {C_TEXT_MAIN}; letter-spacing: -1px;")
+        tl = styled(QLabel(NOTES_TITLE, self), role="title")
+        THEME.changed.connect(lambda: tl.setText(NOTES_TITLE))
         
         self.pivot = SegmentedWidget(self)
         self.pivot.addItem("notes", "📚 Notatki")
@@ -678,7 +2457,7 @@ class NotesInterface(QWidget):
         self.pivot.setCurrentItem("notes")
         self.pivot.setFixedHeight(36) 
         self.pivot.setFixedWidth(240)
-        self.pivot.currentItemChanged.connect(lambda k: self.refresh()) 
+        self.pivot.currentItemChanged.connect(lambda k: self.filter_list(self.search.text())) 
         
         top_bar.addWidget(tl)
         top_bar.addSpacing(40)
@@ -689,61 +2468,54 @@ class NotesInterface(QWidget):
         self.search.setPlaceholderText("🔍 Szukaj...")
         self.search.setFixedWidth(280)
         self.search.setFixedHeight(40)
-        self.search.textChanged.connect(self.filter_list)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(lambda: self.filter_list(self.search.text()))
+        self.search.textChanged.connect(lambda txt: self.filter_list(txt) if not txt else self._search_timer.start())
         
         btn_add = PrimaryPushButton("Importuj", self)
         btn_add.setIcon(FluentIcon.ADD)
         btn_add.setFixedHeight(40)
         btn_add.clicked.connect(self.parent_app.import_file)
         
+        btn_folder = PushButton("Folder", self)
+        btn_folder.setIcon(FluentIcon.FOLDER_ADD)
+        btn_folder.setFixedHeight(40)
+        btn_folder.clicked.connect(self.parent_app.import_folder)
+        
         top_bar.addWidget(self.search)
         top_bar.addSpacing(12)
+        top_bar.addWidget(btn_folder)
+        top_bar.addSpacing(8)
         top_bar.addWidget(btn_add)
         
         l.addLayout(top_bar)
         
         # Enhanced Generator Card
-        self.gen_card = AnimatedCard()
+        self.gen_card = styled(AnimatedCard(), "GenCard")
         self.gen_card.setFixedHeight(100)
-        self.gen_card.setStyleSheet(f"""
-            CardWidget {{ 
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 {C_BG_CARD}, stop:1 {C_BG_ELEVATED});
-                border: 1px solid rgba(255, 255, 255, 0.05); 
-                border-radius: 16px; 
-            }}
-        """)
         gc_layout = QHBoxLayout(self.gen_card)
         gc_layout.setContentsMargins(28, 16, 28, 16)
         gc_layout.setSpacing(16)
         
         # Icon for generator
-        gen_icon_container = QWidget()
+        gen_icon_container = styled(QWidget(), "GenIcon")
+        gen_icon_container.setAttribute(Qt.WA_StyledBackground)
         gen_icon_container.setFixedSize(56, 56)
-        gen_icon_container.setStyleSheet(f"""
-            QWidget {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 {C_NEON_PURPLE}, stop:1 {C_ACCENT_LIGHT});
-                border-radius: 14px;
-            }}
-        """)
         
         gen_icon_layout = QVBoxLayout(gen_icon_container)
         gen_icon_layout.setContentsMargins(0, 0, 0, 0)
         gen_icon_layout.setAlignment(Qt.AlignCenter)
         
         gen_icon_lbl = QLabel("🤖")
-        gen_icon_lbl.setStyleSheet("font-size: 28px; background: transparent;")
         gen_icon_layout.addWidget(gen_icon_lbl)
         
         gen_text = QVBoxLayout()
         gen_text.setSpacing(4)
         
-        gc_lbl = StrongBodyLabel("Generator Ćwiczeń", self.gen_card)
-        gc_lbl.setStyleSheet(f"color: {C_TEXT_MAIN}; font-size: 16px; font-weight: 700;")
-        
-        gc_sub = CaptionLabel("Automatycznie twórz zadania z notatek", self.gen_card)
-        gc_sub.setStyleSheet(f"color: {C_TEXT_MUTED}; font-size: 12px;")
+        gc_lbl = styled(QLabel("Generator Ćwiczeń", self.gen_card), role="card-title")
+        gc_sub = styled(QLabel("Automatycznie twórz zadania z notatek", self.gen_card), role="caption")
         
         gen_text.addWidget(gc_lbl)
         gen_text.addWidget(gc_sub)
@@ -752,6 +2524,7 @@ class NotesInterface(QWidget):
         self.note_combo.setPlaceholderText("Wybierz notatkę źródłową...")
         self.note_combo.setFixedWidth(320)
         self.note_combo.setFixedHeight(40)
+        self._combo_sizes = {}   # subject -> number of combo entries, in combo order
         
         self.btn_gen = PrimaryPushButton("Generuj", self.gen_card)
         self.btn_gen.setIcon(FluentIcon.ROBOT)
@@ -762,8 +2535,11 @@ class NotesInterface(QWidget):
         self.progress_ring.setFixedSize(28, 28)
         self.progress_ring.setVisible(False)
         
-        self.status_lbl = CaptionLabel("", self.gen_card)
-        self.status_lbl.setStyleSheet(f"color: {C_TEXT_MUTED}; font-size: 12px;")
+        self.gen_progress = ProgressBar(self.gen_card)
+        self.gen_progress.setFixedWidth(120)
+        self.gen_progress.setVisible(False)
+        
+        self.status_lbl = styled(QLabel("", self.gen_card), role="caption")
         
         gc_layout.addWidget(gen_icon_container)
         gc_layout.addLayout(gen_text)
@@ -773,136 +2549,181 @@ class NotesInterface(QWidget):
         gc_layout.addWidget(self.btn_gen)
         gc_layout.addSpacing(12)
         gc_layout.addWidget(self.progress_ring)
+        gc_layout.addWidget(self.gen_progress)
         gc_layout.addWidget(self.status_lbl)
         gc_layout.addStretch()
         
         l.addWidget(self.gen_card)
+        self.batch = None
         
         # Enhanced List
-        self.scroll = ScrollArea()
-        self.scroll.setWidgetResizable(True)
-        self.scroll.setStyleSheet("background: transparent; border: none;")
-        
-        self.con = QWidget()
-        self.con.setObjectName("NotesContainer")
-        self.con.setStyleSheet(f"QWidget#NotesContainer {{ background-color: {C_BG_MAIN}; }}")
-        self.notes_layout = QVBoxLayout(self.con)
-        self.notes_layout.setSpacing(14)
-        self.notes_layout.setAlignment(Qt.AlignTop)
-        
-        self.scroll.setWidget(self.con)
-        l.addWidget(self.scroll)
-        
-    def populate_combo(self):
-        self.note_combo.clear()
+        self.model = NotesModel(self)
+        self.proxy = NotesFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.delegate = NoteCardDelegate(self)
+        self.delegate.note_clicked.connect(self.parent_app.open_note)
+        self.delegate.delete_clicked.connect(self.parent_app.delete_note)
+        
+        self.list = QListView(self)
+        self.list.setModel(self.proxy)
+        self.list.setItemDelegate(self.delegate)
+        self.list.setMouseTracking(True)
+        self._hover = QTimer(self)
+        self._hover.setSingleShot(True)
+        self._hover.setInterval(HOVER_PRELOAD_MS)
+        self._hover.timeout.connect(self._preload_hovered)
+        self.list.entered.connect(lambda idx: self._hover.start())
+        self.list.viewport().setAttribute(Qt.WA_Hover)
+        self.list.setCursor(Qt.PointingHandCursor)
+        self.list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.list.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.list.setLayoutMode(QListView.Batched)
+        self.list.setFrameShape(QFrame.NoFrame)
+        self.list.setObjectName("NotesList")
+        THEME.changed.connect(self.list.viewport().update)
+        l.addWidget(self.list)
+        
+        self.empty = QWidget(self)
+        empty_layout = QVBoxLayout(self.empty)
+        empty_layout.setContentsMargins(0, 48, 0, 0)
+        empty_layout.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+        
+        empty = styled(QLabel("🗂️", self.empty), "EmptyIcon")
+        empty.setAlignment(Qt.AlignCenter)
+        
+        empty_text = styled(QLabel("Brak elementów w tej sekcji", self.empty), "EmptyText")
+        empty_text.setAlignment(Qt.AlignCenter)
+        
+        empty_layout.addWidget(empty)
+        empty_layout.addWidget(empty_text)
+        l.addWidget(self.empty)
+        self.empty.setVisible(False)
+        
+        self.parent_app.index.changed.connect(lambda: self.proxy.query and self.filter_list(self.search.text()))
+        
+    def populate_combo(self, subjects=None):
+        """Single notes plus one "whole subject" entry per subject; userData is a list of (path, title).
+        With `subjects` only those blocks are replaced in place."""
         data = self.parent_app.data.get("subjects", {})
-        for s, notes in data.items():
-            for n, m in notes.items():
-                if "CWICZENIA_" not in n: 
-                    self.note_combo.addItem(f"{s}: {n}", userData=m["path"])
+        if subjects is None:
+            self.note_combo.clear()
+            self._combo_sizes = {}
+            subjects = list(data)
+        for s in subjects:
+            start = 0
+            for other, size in self._combo_sizes.items():
+                if other == s: break
+                start += size
+            for _ in range(self._combo_sizes.get(s, 0)): self.note_combo.removeItem(start)
+            if s not in data:
+                self._combo_sizes.pop(s, None)
+                continue
+            items = [(m["path"], n) for n, m in data[s].items() if "CWICZENIA_" not in n]
+            entries = [(f"{s}: {n}", [(path, n)]) for path, n in items]
+            if len(items) > 1: entries.append((f"📚 Cały przedmiot: {s} ({len(items)})", items))
+            for off, (text, sources) in enumerate(entries): self.note_combo.insertItem(start + off, text, userData=sources)
+            self._combo_sizes[s] = len(entries)   # keeps its place; new subjects are appended like in data
+
+    def selected_sources(self):
+        """Notes multi-selected in the list take precedence over the combo box."""
+        rows = [i.data(NotesModel.RowRole) for i in self.list.selectionModel().selectedIndexes()]
+        rows = [(r.path, r.name) for r in rows if r.kind == "note" and "CWICZENIA_" not in r.name]
+        if len(rows) > 1: return rows
+        if not self.note_combo.currentText(): return []
+        return self.note_combo.itemData(self.note_combo.currentIndex()) or []
 
     def start_generation(self):
-        if not self.note_combo.currentText():
+        if self.batch:
+            self.batch.cancel()
+            self.status_lbl.setText("Anulowanie...")
+            return
+        items = self.selected_sources()
+        if not items:
             InfoBar.warning("Błąd", "Wybierz notatkę z listy!", parent=self)
             return
-            
-        path = self.note_combo.itemData(self.note_combo.currentIndex())
-        name = self.note_combo.currentText().split(": ")[1]
-        
-        if not os.path.exists(path): return
+        if not ai_client().available:
+            InfoBar.error("Błąd", "Brak bibliotek AI", parent=self)
+            return
+        missing = [t for p, t in items if not os.path.exists(p)]
+        items = [(p, t) for p, t in items if os.path.exists(p)]
+        if missing: InfoBar.warning("Brak plików", ", ".join(missing[:3]), parent=self)
+        if not items: return
         
-        self.btn_gen.setDisabled(True)
+        self.btn_gen.setText("Anuluj")
         self.progress_ring.setVisible(True)
         self.progress_ring.start()
+        self.gen_progress.setRange(0, len(items))
+        self.gen_progress.setValue(0)
+        self.gen_progress.setVisible(len(items) > 1)
         self.status_lbl.setText("Analizuję i tworzę zadania...")
         
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = BeautifulSoup(f.read(), "html.parser").get_text()
-        except:
-            content = ""
-            
-        key = self.parent_app.data.get("api_key")
-        self.worker = HTMLGenWorker(key, content, name)
-        self.worker.finished.connect(self.on_generation_finished)
-        self.worker.start()
+        self.batch = BatchGenerator(self.parent_app.data.get("api_key"), items, parent=self)
+        self.batch.item_done.connect(self.on_generation_finished)
+        self.batch.progress.connect(self._on_progress)
+        self.batch.finished.connect(self._on_batch_finished)
+        self.batch.start()
         
-    def on_generation_finished(self, name, html):
-        p = os.path.join(NOTES_DIR, name)
-        with open(p, 'w', encoding='utf-8') as f: f.write(html)
+    def _on_progress(self, done, total, title):
+        self.gen_progress.setValue(done)
+        self.status_lbl.setText(f"{done}/{total} · {title.replace('.html', '')[:28]}")
         
-        if "Inne" not in self.parent_app.data["subjects"]: self.parent_app.data["subjects"]["Inne"] = {}
-        self.parent_app.data["subjects"]["Inne"][name] = {"path": p}
-        self.parent_app.save_data()
+    def on_generation_finished(self, name, html):
+        blob = self.parent_app.blobs.put_bytes(html.encode('utf-8'), ".html")
+        self.parent_app.add_note("Inne", name, blob)
         
-        self.btn_gen.setDisabled(False)
+    def _on_batch_finished(self, report):
+        self.batch.deleteLater()
+        self.batch = None
+        self.btn_gen.setText("Generuj")
         self.progress_ring.stop()
         self.progress_ring.setVisible(False)
+        self.gen_progress.setVisible(False)
         self.status_lbl.setText("")
         
-        self.pivot.setCurrentItem("exercises")
-        self.refresh()
-        
-        InfoBar.success("Gotowe!", "Ćwiczenia zostały wygenerowane.", parent=self)
+        if report["ok"]:
+            self.pivot.setCurrentItem("exercises")
+        self.refresh({"Inne"})
+        
+        if report["cancelled"] and not report["failed"]:
+            InfoBar.info("Anulowano", f"Gotowe: {report['ok']}/{report['total']}, "
+                         f"anulowane: {report['cancelled']}", parent=self)
+        elif not report["failed"]:
+            msg = "Ćwiczenia zostały wygenerowane." if report["total"] == 1 else \
+                  f"{report['ok']} arkuszy w {report['seconds']} s ({report['per_min']}/min)."
+            InfoBar.success("Gotowe!", msg, parent=self)
+        else:
+            errors = "; ".join(f"{t}: {e[:60]}" for t, e in report["failed"][:3])
+            InfoBar.warning(f"Gotowe: {report['ok']}/{report['total']}",
+                            f"{report['per_min']}/min, ponowienia: {report['retries']}, anulowane: {report['cancelled']}. Błędy: {errors}",
+                            duration=10000, parent=self)
 
-    def refresh(self):
-        self.populate_combo()
-        
-        for i in reversed(range(self.notes_layout.count())): 
-            if self.notes_layout.itemAt(i).widget(): self.notes_layout.itemAt(i).widget().setParent(None)
-            
+    def refresh(self, subjects=None):
+        """Rebuild the list and combo, or with `subjects` only the blocks of those subjects (O(changed rows))."""
         data = self.parent_app.data.get("subjects", {})
-        show_exercises = (self.pivot.currentItem().text() == "🏋️ Ćwiczenia")
-        
-        found_any = False
-        
-        for s, notes in data.items():
-            filtered_notes = {}
-            for n, m in notes.items():
-                is_exercise = "CWICZENIA_" in n
-                if show_exercises and is_exercise:
-                    filtered_notes[n] = m
-                elif not show_exercises and not is_exercise:
-                    filtered_notes[n] = m
-            
-            if not filtered_notes: continue
-            
-            found_any = True
-            lbl = QLabel(s.upper(), self)
-            lbl.setStyleSheet(f"color: {C_TEXT_MUTED}; margin-top: 32px; margin-bottom: 12px; font-size: 13px; font-weight: 700; letter-spacing: 1.5px;")
-            self.notes_layout.addWidget(lbl)
-            
-            for n, m in filtered_notes.items():
-                item = NoteListItem(n, s, m["path"])
-                item.note_clicked.connect(self.parent_app.open_note)
-                item.delete_clicked.connect(self.parent_app.delete_note)
-                self.notes_layout.addWidget(item)
-        
-        if not found_any:
-            empty_container = QWidget()
-            empty_container.setFixedHeight(200)
-            empty_layout = QVBoxLayout(empty_container)
-            empty_layout.setAlignment(Qt.AlignCenter)
-            
-            empty = QLabel("🗂️", self)
-            empty.setStyleSheet(f"color: {C_TEXT_MUTED}; font-size: 64px;")
-            empty.setAlignment(Qt.AlignCenter)
-            
-            empty_text = QLabel("Brak elementów w tej sekcji", self)
-            empty_text.setStyleSheet(f"color: {C_TEXT_MUTED}; font-size: 16px; font-weight: 600;")
-            empty_text.setAlignment(Qt.AlignCenter)
-            
-            empty_layout.addWidget(empty)
-            empty_layout.addWidget(empty_text)
-            
-            self.notes_layout.addWidget(empty_container)
+        block = lambda subj, notes: [NoteRow("header", subj, "", "")] + [NoteRow("note", subj, n, m["path"]) for n, m in notes.items()]
+        if subjects is None or not self.model.rowCount():
+            self.populate_combo()
+            self.model.set_rows([r for subj, notes in data.items() for r in block(subj, notes)])
+        else:
+            for subj in subjects: self.model.set_subject(subj, block(subj, data[subj]) if subj in data else [])
+            self.populate_combo(subjects)
+        if self.proxy.query: self.filter_list(self.search.text())
+        else: self.update_empty()
                 
     def filter_list(self, txt):
-        txt = txt.lower()
-        for i in range(self.notes_layout.count()):
-            w = self.notes_layout.itemAt(i).widget()
-            if isinstance(w, NoteListItem):
-                w.setVisible(txt in w.name.lower() or txt in w.subj.lower())
+        """Name/subject substring match plus full-text hits, ranked by score while a query is active."""
+        hits = self.parent_app.index.search(txt) if len(txt.strip()) > 1 else {}
+        self.proxy.set_filter(self.pivot.currentItem().text() == "🏋️ Ćwiczenia", txt, hits)
+        self.update_empty()
+
+    def _preload_hovered(self):
+        pos = self.list.viewport().mapFromGlobal(QCursor.pos())
+        row = self.list.indexAt(pos).data(NotesModel.RowRole)
+        if row and row.kind == "note": self.parent_app.preload_note(row.path)
+
+    def update_empty(self):
+        self.list.setVisible(self.proxy.rowCount() > 0)
+        self.empty.setVisible(self.proxy.rowCount() == 0)
 
 class ViewerInterface(QWidget):
     def __init__(self, parent_app):
@@ -913,8 +2734,7 @@ class ViewerInterface(QWidget):
         l.setSpacing(0)
         
         # Enhanced top bar
-        bar = QFrame()
-        bar.setStyleSheet(f"background: {C_BG_CARD}; border-bottom: 1px solid rgba(255, 255, 255, 0.05);")
+        bar = styled(QFrame(), "ViewerBar")
         bar.setFixedHeight(72)
         bl = QHBoxLayout(bar)
         bl.setContentsMargins(32,0,32,0)
@@ -924,97 +2744,121 @@ class ViewerInterface(QWidget):
         btn_back.setFixedHeight(40)
         btn_back.clicked.connect(lambda: self.parent_app.switchTo(self.parent_app.notes_interface))
         
-        self.lbl_title = QLabel("Podgląd", self)
-        self.lbl_title.setStyleSheet(f"font-size: 20px; color: {C_TEXT_MAIN}; font-weight: 700;")
+        self.lbl_title = styled(QLabel("Podgląd", self), role="section")
         
         bl.addWidget(btn_back); bl.addSpacing(24); bl.addWidget(self.lbl_title); bl.addStretch()
         l.addWidget(bar)
         
-        self.web = QWebEngineView()
-        self.web.page().setBackgroundColor(QColor(C_BG_MAIN))
-        l.addWidget(self.web)
-        
+        profile = QWebEngineProfile.defaultProfile()
+        install_note_scheme(profile)
+        if not profile.scripts().findScripts(THEME_STYLE_ID): install_theme_script(profile)
+        self.stack = QStackedWidget(self)
+        l.addWidget(self.stack)
+        self.web = None
+        self._views = OrderedDict()    # abs path -> (view, mtime_ns, size), least recently shown first
+        self._spare = None             # (key, view, mtime_ns, size) of the hover preload, outside the pool
+        self._scroll = OrderedDict()   # abs path -> (x, y) of pages that left the pool
+        THEME.changed.connect(self.on_theme)
+        
+    def _key(self, path):
+        path = os.path.abspath(path)
+        try: st = os.stat(path)
+        except OSError: return path, 0, 0
+        return path, st.st_mtime_ns, st.st_size
+
+    def _navigate(self, view, key):
+        view.note_key = key
+        url = QUrl.fromLocalFile(key)
+        if HAS_NOTE_SCHEME:
+            url.setScheme(NOTE_SCHEME)
+            view.setUrl(url)
+        else:
+            view.setHtml(RENDER_CACHE.get(key).decode('utf-8', 'replace'), url)
+
+    def _new_view(self, key):
+        view = QWebEngineView(self.stack)
+        view.page().setBackgroundColor(QColor(THEME.c["bg_main"]))
+        view.loadFinished.connect(lambda ok, v=view: self._on_loaded(v, v.note_key, ok))
+        self._navigate(view, key)
+        self.stack.addWidget(view)
+        return view
+
+    def _view_for(self, path):
+        """Pooled page for `path` (moved to the MRU end), the adopted hover preload, or a freshly loading
+        one; stale pages are reloaded."""
+        key, mtime, size = self._key(path)
+        entry = self._views.get(key)
+        if entry and entry[1:] == (mtime, size):
+            self._views.move_to_end(key)
+            STATS["viewer_pool_hits"] += 1
+            return entry[0]
+        if entry: self._drop(key)
+        if self._spare and self._spare[0] == key and self._spare[2:] == (mtime, size):
+            view = self._spare[1]
+            self._spare = None
+            STATS["viewer_preload_hits"] += 1
+        else:
+            view = self._new_view(key)
+            STATS["viewer_pool_misses"] += 1
+        self._views[key] = (view, mtime, size)
+        return view
+
     def load(self, path, title):
         self.lbl_title.setText(title)
-        self.web.setUrl(QUrl.fromLocalFile(os.path.abspath(path)))
-        
-        css = f"""
-        * {{ color: {C_TEXT_MAIN} !important; }}
-        body, html {{ 
-            background-color: {C_BG_MAIN} !important; 
-            font-family: 'Segoe UI', -apple-system, sans-serif !important;
-            padding: 48px !important;
-            max-width: 900px !important;
-            margin: 0 auto !important;
-            line-height: 1.7 !important;
-        }}
-        div, p, span, table, tr, td, th, section, article, aside, li, ul {{
-            background-color: {C_BG_CARD} !important; 
-            border-color: rgba(255, 255, 255, 0.05) !important;
-        }}
-        h1, h2, h3, h4 {{ 
-            color: {C_ACCENT_LIGHT} !important; 
-            background-color: transparent !important; 
-            margin-top: 32px !important;
-            margin-bottom: 16px !important;
-            font-weight: 700 !important;
-            letter-spacing: -0.5px !important;
-        }}
-        h1 {{ font-size: 36px !important; }}
-        h2 {{ font-size: 28px !important; }}
-        h3 {{ font-size: 22px !important; }}
-        a {{ color: {C_NEON_CYAN} !important; text-decoration: none !important; }}
-        a:hover {{ text-decoration: underline !important; }}
-        code, pre {{ 
-            background-color: #000000 !important; 
-            color: {C_SUCCESS} !important; 
-            border: 1px solid rgba(255, 255, 255, 0.1) !important;
-            padding: 2px 6px !important;
-            border-radius: 6px !important;
-            font-family: 'Consolas', monospace !important;
-        }}
-        pre {{ 
-            padding: 16px !important; 
-            margin: 16px 0 !important;
-            overflow-x: auto !important;
-        }}
-        img {{ border-radius: 12px; opacity: 0.95; max-width: 100% !important; }}
-        
-        details {{
-            background-color: {C_BG_ELEVATED} !important;
-            border: 1px solid rgba(255, 255, 255, 0.1) !important;
-            padding: 20px !important;
-            border-radius: 12px !important;
-            margin-top: 20px !important;
-        }}
-        summary {{
-            cursor: pointer !important;
-            color: {C_ACCENT_LIGHT} !important;
-            font-weight: 700 !important;
-            outline: none !important;
-            font-size: 16px !important;
-            padding: 4px 0 !important;
-        }}
-        summary:hover {{
-            color: {C_ACCENT} !important;
-        }}
-        table {{
-            border-collapse: collapse !important;
-            width: 100% !important;
-            margin: 20px 0 !important;
-        }}
-        th, td {{
-            padding: 12px !important;
-            text-align: left !important;
-            border: 1px solid rgba(255, 255, 255, 0.1) !important;
-        }}
-        th {{
-            background-color: {C_BG_ELEVATED} !important;
-            font-weight: 700 !important;
-        }}
-        """
-        js = f"var style = document.createElement('style'); style.innerHTML = `{css}`; document.head.appendChild(style);"
-        self.web.loadFinished.connect(lambda: self.web.page().runJavaScript(js))
+        self.web = self._view_for(path)
+        self.stack.setCurrentWidget(self.web)
+        self._evict()
+
+    def preload(self, path):
+        """Warm the note under the cursor in a single spare page that never evicts shown ones;
+        a new hover navigates the same view instead of building another."""
+        key, mtime, size = self._key(path)
+        if VIEWER_POOL_SIZE < 2 or key in self._views or size > VIEWER_POOL_MAX_BYTES: return
+        if self._spare and self._spare[0] == key and self._spare[2:] == (mtime, size): return
+        STATS["viewer_preloads"] += 1
+        if self._spare:
+            view = self._spare[1]
+            view.stop()
+            self._navigate(view, key)
+        else:
+            view = self._new_view(key)
+        self._spare = (key, view, mtime, size)
+
+    def _evict(self):
+        """Drop least recently shown pages beyond VIEWER_POOL_SIZE / VIEWER_POOL_MAX_BYTES (never the current one)."""
+        cap = max(1, VIEWER_POOL_SIZE)
+        while len(self._views) > 1:
+            if len(self._views) <= cap and sum(e[2] for e in self._views.values()) <= VIEWER_POOL_MAX_BYTES: break
+            key = next(k for k, e in self._views.items() if e[0] is not self.web)
+            self._drop(key)
+            STATS["viewer_pool_evictions"] += 1
+
+    def _drop(self, key):
+        view = self._views.pop(key)[0]
+        pos = view.page().scrollPosition()
+        if pos.y() or pos.x():
+            self._scroll[key] = (pos.x(), pos.y())
+            while len(self._scroll) > 256: self._scroll.popitem(last=False)
+        self.stack.removeWidget(view)
+        view.deleteLater()
+
+    def on_theme(self):
+        """New stylesheet for pages: re-register the user script, drop hidden pages, reload the visible one."""
+        install_theme_script(QWebEngineProfile.defaultProfile())
+        for key in [k for k, e in self._views.items() if e[0] is not self.web]: self._drop(key)
+        if self._spare:
+            self.stack.removeWidget(self._spare[1])
+            self._spare[1].deleteLater()
+            self._spare = None
+        if self.web:
+            self.web.page().setBackgroundColor(QColor(THEME.c["bg_main"]))
+            self.web.reload()
+
+    def _on_loaded(self, view, key, ok):
+        STATS["viewer_loads"] += 1
+        STATS["viewer_theme_scripts"] = len(QWebEngineProfile.defaultProfile().scripts().findScripts(THEME_STYLE_ID))
+        pos = self._scroll.pop(key, None)
+        if ok and pos: view.page().runJavaScript(f"window.scrollTo({pos[0]}, {pos[1]});")
 
 class AIInterface(QWidget):
     def __init__(self, parent_app):
@@ -1027,11 +2871,8 @@ class AIInterface(QWidget):
         
         # Header
         header = QHBoxLayout()
-        tl = TitleLabel("AI Studio", self)
-        tl.setStyleSheet(f"font-size: 36px; font-weight: 900; color: {C_TEXT_MAIN}; letter-spacing: -1px;")
-        
-        subtitle = CaptionLabel("Zadawaj pytania o swoje notatki", self)
-        subtitle.setStyleSheet(f"color: {C_TEXT_MUTED}; font-size: 14px; margin-left: 4px;")
+        tl = styled(QLabel("AI Studio", self), role="title")
+        subtitle = styled(QLabel("Zadawaj pytania o swoje notatki", self), role="subtitle")
         
         header.addWidget(tl)
         header.addSpacing(16)
@@ -1039,31 +2880,28 @@ class AIInterface(QWidget):
         header.addStretch()
         l.addLayout(header)
         
-        chat_box = AnimatedCard()
-        chat_box.setStyleSheet(f"""
-            CardWidget {{ 
-                background-color: {C_BG_CARD}; 
-                border: 1px solid rgba(255, 255, 255, 0.05);
-                border-radius: 20px;
-            }}
-        """)
+        chat_box = styled(AnimatedCard(), "ChatCard")
         cl = QVBoxLayout(chat_box); 
         cl.setContentsMargins(32,32,32,32)
         cl.setSpacing(20)
         
-        st = QLabel("🤖 Asystent Notatek", self)
-        st.setStyleSheet(f"color: {C_TEXT_MAIN}; font-size: 20px; font-weight: 700;")
-        cl.addWidget(st)
+        st_row = QHBoxLayout()
+        st = styled(QLabel("🤖 Asystent Notatek", self), role="section")
+        self.cache_lbl = styled(QLabel("", self), role="caption")
+        st_row.addWidget(st)
+        st_row.addStretch()
+        st_row.addWidget(self.cache_lbl)
+        cl.addLayout(st_row)
         
         self.out = TextEdit()
         self.out.setReadOnly(True)
-        self.out.setStyleSheet(f"""
-            background: {C_BG_MAIN}; 
+        THEME.local(self.out, lambda: f"""
+            background: {THEME.c['bg_main']}; 
             border: 1px solid rgba(255, 255, 255, 0.05); 
             font-size: 15px; 
             padding: 20px; 
             border-radius: 12px; 
-            color: {C_TEXT_MAIN};
+            color: {THEME.c['text_main']};
             line-height: 1.6;
         """)
         
@@ -1080,30 +2918,200 @@ class AIInterface(QWidget):
             }}
         """)
         
-        btn = PrimaryPushButton("Wyślij", self)
-        btn.setIcon(FluentIcon.SEND)
-        btn.setFixedHeight(48)
-        btn.setFixedWidth(120)
-        btn.clicked.connect(self.ask)
+        self.btn_send = PrimaryPushButton("Wyślij", self)
+        self.btn_send.setIcon(FluentIcon.SEND)
+        self.btn_send.setFixedHeight(48)
+        self.btn_send.setFixedWidth(120)
+        self.btn_send.clicked.connect(self.ask)
         
         input_row.addWidget(self.inp)
-        input_row.addWidget(btn)
+        input_row.addWidget(self.btn_send)
         
         cl.addWidget(self.out, 1)
         cl.addLayout(input_row)
         l.addWidget(chat_box)
+        
+        self.debug_lbl = styled(QLabel(self.out), "DebugOverlay")
+        self.debug_lbl.setVisible(DEBUG_OVERLAY)
+        self.out.installEventFilter(self)
+        self.worker = None
+        self._pending = False   # question sent while its note text is still being extracted
+
+    def eventFilter(self, obj, e):
+        if obj is self.out and e.type() == QEvent.Resize: self._place_debug()
+        return False
+
+    def _place_debug(self):
+        self.debug_lbl.adjustSize()
+        self.debug_lbl.move(self.out.width() - self.debug_lbl.width() - 12, 12)
+
+    def _set_debug(self, text):
+        self.debug_lbl.setText(text)
+        self._place_debug()
 
     def ask(self):
-        ctx = self.parent_app.get_current_text()
-        if not ctx: return InfoBar.warning("Błąd", "Najpierw otwórz notatkę", parent=self)
+        if self.worker and self.worker.isRunning():
+            self.worker.requestInterruption()
+            return
+        if self._pending: return
+        path = self.parent_app.current_note_path
+        if not path: return InfoBar.warning("Błąd", "Najpierw otwórz notatkę", parent=self)
         key = self.parent_app.data.get("api_key")
         if not key: return InfoBar.error("Błąd", "Brak klucza API", parent=self)
         
-        self.worker = AIWorker(key, self.inp.text(), ctx)
-        self.worker.finished.connect(lambda t: self.out.append(f"\n🤖 AI: {t}\n"))
-        self.worker.start()
-        self.out.append(f"👤 Ty: {self.inp.text()}")
+        question = self.inp.text()
+        self.out.append(f"👤 Ty: {question}")
         self.inp.clear()
+        self._pending = True
+        self.parent_app.texts.request(path, lambda ctx: self._send(key, question, ctx))
+        
+    def _send(self, key, question, ctx):
+        self._pending = False
+        if not ctx: return InfoBar.warning("Błąd", "Nie udało się odczytać notatki", parent=self)
+        self.worker = AIWorker(key, question, ctx)
+        self.worker.chunk.connect(self._append_chunk)
+        self.worker.first_token.connect(self._on_first_token)
+        self.worker.cached.connect(lambda: self._append_chunk("⚡ (z pamięci) "))
+        self.worker.finished.connect(self._on_answer)
+        self.out.append("\n🤖 AI: ")
+        self._t_start = time.perf_counter()
+        self._n_chunks = 0
+        self._ttft = None
+        self.btn_send.setText("Stop")
+        self.btn_send.setIcon(FluentIcon.CANCEL)
+        self.worker.start()
+        
+    def _on_first_token(self, ms):
+        self._ttft = ms
+        self._set_debug(f"TTFT {ms:.0f} ms")
+
+    def _append_chunk(self, text):
+        self._n_chunks += 1
+        self.out.moveCursor(QTextCursor.End)
+        self.out.insertPlainText(text)
+        self.out.ensureCursorVisible()
+        
+    def _on_answer(self, text):
+        self.out.append("")
+        self.btn_send.setText("Wyślij")
+        self.btn_send.setIcon(FluentIcon.SEND)
+        self.cache_lbl.setText(f"⚡ Cache: {STATS['ai_cache_hits']} trafień / {STATS['ai_cache_misses']} chybień")
+        total = (time.perf_counter() - self._t_start) * 1000
+        ttft = "—" if self._ttft is None else f"{self._ttft:.0f} ms"
+        self._set_debug(f"TTFT {ttft} · całość {total:.0f} ms · {self._n_chunks} fragm.")
+
+class PlaygroundWorker(QObject):
+    """Warm child interpreter running playground code (see playground_worker); one run at a time."""
+    output = pyqtSignal(str, str)    # stream ("out" | "err"), text
+    finished = pyqtSignal(dict)      # ok, error, wall, cpu, reason
+    session_lost = pyqtSignal()      # the process died, taking the session namespace with it
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.proc = None
+        self._run = None
+        self._killed = None
+        self._seq = 0
+        self._buf = b""
+        self._closing = False
+        self._spare = None
+        self._timeout = QTimer(self)
+        self._timeout.setSingleShot(True)
+        self._timeout.timeout.connect(lambda: self.kill("timeout"))
+        self.start()
+
+    @staticmethod
+    def command():
+        args = ["--playground-worker"] + (["--mem", str(PLAYGROUND_MEMORY_MB)] if PLAYGROUND_MEMORY_MB else [])
+        if PLAYGROUND_PRELOAD: args += ["--preload", ",".join(PLAYGROUND_PRELOAD)]
+        if getattr(sys, "frozen", False): return sys.executable, args
+        return sys.executable, ["-u", os.path.abspath(__file__)] + args
+
+    def _spawn(self):
+        proc = QProcess(self)
+        proc.start(*self.command())
+        proc.waitForStarted(5000)
+        STATS["playground_spawns"] += 1
+        return proc
+
+    def start(self):
+        """Adopt the spare worker if one is warm (else spawn), then start the next spare."""
+        if self._closing: return
+        if self.proc is not None: self.proc.deleteLater()
+        self._buf = b""
+        spare, self._spare = self._spare, None
+        if spare is not None and spare.state() == QProcess.Running: STATS["playground_spare_used"] += 1
+        else:
+            if spare is not None:   # died (e.g. out of memory) or never came up: don't leak the QProcess
+                if spare.state() != QProcess.NotRunning: spare.kill()
+                spare.deleteLater()
+            spare = self._spawn()
+        self.proc = spare
+        self.proc.readyReadStandardOutput.connect(self._read_out)
+        self.proc.readyReadStandardError.connect(self._read_err)
+        self.proc.finished.connect(self._on_exit)
+        self._read_out()
+        if PLAYGROUND_SPARE: self._spare = self._spawn()
+
+    def reset(self):
+        """Forget the session namespace (the interpreter and its imports stay warm)."""
+        if self.proc is not None and self.proc.state() == QProcess.Running:
+            self.proc.write(b'{"reset": true}\n')
+
+    @property
+    def busy(self): return self._run is not None
+
+    def run(self, code, session=False, line=0):
+        if self.proc is None or self.proc.state() == QProcess.NotRunning: self.start()
+        self._seq += 1
+        self._run = {"id": self._seq, "t0": time.perf_counter()}
+        req = {"id": self._seq, "code": code, "session": session, "line": line}
+        self.proc.write((json.dumps(req) + "\n").encode('utf-8'))
+        if PLAYGROUND_TIMEOUT_S: self._timeout.start(PLAYGROUND_TIMEOUT_S * 1000)
+
+    def kill(self, reason="stopped"):
+        if self._run is None: return
+        self._killed = reason
+        self.proc.kill()
+
+    def close(self):
+        self._closing = True
+        for proc in (self.proc, self._spare):
+            if proc is not None and proc.state() != QProcess.NotRunning:
+                proc.kill()
+                proc.waitForFinished(1000)
+
+    def _read_out(self):
+        self._buf += bytes(self.proc.readAllStandardOutput())
+        *lines, self._buf = self._buf.split(b"\n")
+        for line in lines:
+            try: msg = json.loads(line)
+            except ValueError:   # C extensions writing straight to fd 1
+                if self._run: self.output.emit("out", line.decode('utf-8', 'replace') + "\n")
+                continue
+            if self._run is None or msg.get("id") != self._run["id"]: continue
+            if "stream" in msg: self.output.emit(msg["stream"], msg["text"])
+            elif msg.get("done"): self._finish(msg)
+
+    def _read_err(self):
+        text = bytes(self.proc.readAllStandardError()).decode('utf-8', 'replace')
+        if self._run: self.output.emit("err", text)
+
+    def _finish(self, result):
+        self._timeout.stop()
+        self._run = None
+        STATS["playground_runs"] += 1
+        self.finished.emit(result)
+
+    def _on_exit(self, code, status):
+        if self._run is not None:
+            reason = self._killed or ("memory" if code == PLAYGROUND_MEM_EXIT else "crash")
+            STATS[f"playground_{reason}"] += 1
+            self._finish({"ok": False, "error": None, "reason": reason, "code": code,
+                          "wall": time.perf_counter() - self._run["t0"], "cpu": None})
+        self._killed = None
+        self.session_lost.emit()
+        QTimer.singleShot(0, self.start)   # keep a warm interpreter for the next run
 
 class PythonInterface(QWidget):
     def __init__(self):
@@ -1114,11 +3122,8 @@ class PythonInterface(QWidget):
         l.setSpacing(32)
         
         header = QHBoxLayout()
-        tl = TitleLabel("Python Playground", self)
-        tl.setStyleSheet(f"font-size: 36px; font-weight: 900; color: {C_TEXT_MAIN}; letter-spacing: -1px;")
-        
-        subtitle = CaptionLabel("🐍 Testuj kod w czasie rzeczywistym", self)
-        subtitle.setStyleSheet(f"color: {C_TEXT_MUTED}; font-size: 14px; margin-left: 4px;")
+        tl = styled(QLabel("Python Playground", self), role="title")
+        subtitle = styled(QLabel("🐍 Testuj kod w czasie rzeczywistym", self), role="subtitle")
         
         header.addWidget(tl)
         header.addSpacing(16)
@@ -1126,39 +3131,56 @@ class PythonInterface(QWidget):
         header.addStretch()
         l.addLayout(header)
         
-        code_label = QLabel("📝 Kod Źródłowy", self)
-        code_label.setStyleSheet(f"color: {C_TEXT_SUB}; font-size: 14px; font-weight: 600;")
+        code_label = styled(QLabel("📝 Kod Źródłowy", self), role="label")
         l.addWidget(code_label)
         
         self.code = TextEdit()
         self.code.setPlainText("import math\nprint(f'Hello Inżynier! Pi={math.pi:.2f}')")
-        self.code.setStyleSheet(f"""
+        THEME.local(self.code, lambda: f"""
             font-family: 'Consolas', 'Courier New', monospace; 
             font-size: 15px; 
-            color: {C_TEXT_MAIN}; 
-            background: {C_BG_CARD};
+            color: {THEME.c['text_main']}; 
+            background: {THEME.c['bg_card']};
             border: 1px solid rgba(255, 255, 255, 0.05);
             border-radius: 12px;
             padding: 16px;
         """)
         
         btn_container = QHBoxLayout()
-        btn = PrimaryPushButton("▶ Uruchom", self)
-        btn.setIcon(FluentIcon.PLAY)
-        btn.setFixedHeight(48)
-        btn.setFixedWidth(160)
-        btn.clicked.connect(self.run_code)
-        btn_container.addWidget(btn)
+        self.btn = PrimaryPushButton("▶ Uruchom", self)
+        self.btn.setIcon(FluentIcon.PLAY)
+        self.btn.setFixedHeight(48)
+        self.btn.setFixedWidth(160)
+        self.btn.clicked.connect(self.run_code)
+        self.btn_cell = PushButton("▶ Komórka (Ctrl+Enter)", self)
+        self.btn_cell.setFixedHeight(48)
+        self.btn_cell.setToolTip("Uruchamia zaznaczenie albo bieżącą komórkę (bloki oddzielone liniami # %%)")
+        self.btn_cell.clicked.connect(self.run_cell)
+        QShortcut(QKeySequence("Ctrl+Return"), self.code, self.run_cell)
+        self.session_switch = SwitchButton(self)
+        self.session_switch.setOffText("Sesja")
+        self.session_switch.setOnText("Sesja")
+        self.session_switch.setToolTip("Zmienne i importy zostają między uruchomieniami")
+        self.session_switch.checkedChanged.connect(lambda on: on or self.reset_session())
+        btn_reset = TransparentToolButton(FluentIcon.SYNC, self)
+        btn_reset.setToolTip("Wyczyść sesję")
+        btn_reset.clicked.connect(self.reset_session)
+        self.time_lbl = styled(QLabel("", self), role="hint")
+        btn_container.addWidget(self.btn)
+        btn_container.addWidget(self.btn_cell)
+        btn_container.addSpacing(16)
+        btn_container.addWidget(self.session_switch)
+        btn_container.addWidget(btn_reset)
         btn_container.addStretch()
+        btn_container.addWidget(self.time_lbl)
         
-        output_label = QLabel("📊 Wynik", self)
-        output_label.setStyleSheet(f"color: {C_TEXT_SUB}; font-size: 14px; font-weight: 600; margin-top: 8px;")
+        output_label = styled(QLabel("📊 Wynik", self), role="label")
         
         self.out = TextEdit()
         self.out.setReadOnly(True)
-        self.out.setStyleSheet(f"""
+        THEME.local(self.out, lambda: f"""
             font-family: 'Consolas', 'Courier New', monospace; 
-            color: {C_SUCCESS}; 
+            color: {THEME.c['success']}; 
             background: #000000;
             border: 1px solid rgba(255, 255, 255, 0.1);
             border-radius: 12px;
@@ -1171,13 +3193,60 @@ class PythonInterface(QWidget):
         l.addWidget(output_label)
         l.addWidget(self.out, 1)
 
+        self.worker = PlaygroundWorker(self)
+        self.worker.output.connect(self._append)
+        self.worker.finished.connect(self._on_done)
+        self.worker.session_lost.connect(lambda: self.session_switch.isChecked() and
+                                         self.time_lbl.setText("⚠ Sesja utracona, zmienne wyczyszczone"))
+
     def run_code(self):
-        f = StringIO()
-        try:
-            with redirect_stdout(f): exec(self.code.toPlainText(), globals())
-            self.out.setText(f.getvalue())
-        except Exception as e: 
-            self.out.setText(f"❌ Error: {str(e)}")
+        if self.worker.busy:
+            self.worker.kill("stopped")
+            return
+        self._execute(self.code.toPlainText(), 0)
+
+    def run_cell(self):
+        """Selected text, else the `# %%`-delimited cell under the cursor; always in session mode."""
+        if self.worker.busy: return
+        cur = self.code.textCursor()
+        if cur.hasSelection():
+            start = self.code.document().findBlock(cur.selectionStart()).blockNumber()
+            code = cur.selectedText().replace("\u2029", "\n")
+        else:
+            lines = self.code.toPlainText().split("\n")
+            row = cur.blockNumber()
+            start = next((i + 1 for i in range(row, -1, -1) if lines[i].lstrip().startswith("# %%")), 0)
+            end = next((i for i in range(row + 1, len(lines)) if lines[i].lstrip().startswith("# %%")), len(lines))
+            code = "\n".join(lines[start:end])
+        self.session_switch.setChecked(True)
+        self._execute(code, start, clear=False)
+
+    def _execute(self, code, line, clear=True):
+        if clear or not self.session_switch.isChecked(): self.out.clear()
+        self.time_lbl.setText("⏳ Wykonywanie...")
+        self.btn.setText("⏹ Zatrzymaj")
+        self.worker.run(code, session=self.session_switch.isChecked(), line=line)
+
+    def reset_session(self):
+        self.worker.reset()
+        self.time_lbl.setText("↺ Sesja wyczyszczona")
+
+    def _append(self, stream, text):
+        self.out.moveCursor(QTextCursor.End)
+        self.out.setTextColor(QColor(THEME.c["success"] if stream == "out" else "#f87171"))
+        self.out.insertPlainText(text)
+        self.out.ensureCursorVisible()
+
+    def _on_done(self, r):
+        self.btn.setText("▶ Uruchom")
+        reason = r.get("reason")
+        if r.get("error"): self._append("err", f"❌ {r['error']}")
+        elif reason == "timeout": self._append("err", f"\n⏱ Przekroczono limit czasu ({PLAYGROUND_TIMEOUT_S} s) — proces zatrzymany.\n")
+        elif reason == "memory": self._append("err", f"\n💥 Przekroczono limit pamięci ({PLAYGROUND_MEMORY_MB} MB).\n")
+        elif reason == "crash": self._append("err", f"\n💥 Proces zakończył się nieoczekiwanie (kod {r.get('code')}).\n")
+        elif reason == "stopped": self._append("err", "\n⏹ Zatrzymano.\n")
+        cpu = f" · CPU {r['cpu']:.3f} s" if r.get("cpu") is not None else ""
+        self.time_lbl.setText(f"⏱ {r['wall']:.3f} s{cpu}")
 
 class SettingsInterface(QWidget):
     def __init__(self, parent_app):
@@ -1188,11 +3257,8 @@ class SettingsInterface(QWidget):
         l.setSpacing(32)
         
         header = QHBoxLayout()
-        tl = TitleLabel("Ustawienia", self)
-        tl.setStyleSheet(f"font-size: 36px; font-weight: 900; color: {C_TEXT_MAIN}; letter-spacing: -1px;")
-        
-        subtitle = CaptionLabel("⚙️ Konfiguracja aplikacji", self)
-        subtitle.setStyleSheet(f"color: {C_TEXT_MUTED}; font-size: 14px; margin-left: 4px;")
+        tl = styled(QLabel("Ustawienia", self), role="title")
+        subtitle = styled(QLabel("⚙️ Konfiguracja aplikacji", self), role="subtitle")
         
         header.addWidget(tl)
         header.addSpacing(16)
@@ -1200,24 +3266,15 @@ class SettingsInterface(QWidget):
         header.addStretch()
         l.addLayout(header)
         
-        card = AnimatedCard()
-        card.setStyleSheet(f"""
-            CardWidget {{ 
-                background-color: {C_BG_CARD}; 
-                border: 1px solid rgba(255, 255, 255, 0.05);
-                border-radius: 16px;
-            }}
-        """)
+        card = styled(AnimatedCard(), "Panel")
         cl = QVBoxLayout(card); 
         cl.setContentsMargins(32,32,32,32)
         cl.setSpacing(16)
         
-        st = StrongBodyLabel("🔑 Klucz API Google Gemini", self)
-        st.setStyleSheet(f"color: {C_TEXT_MAIN}; font-size: 16px; font-weight: 700;")
+        st = styled(QLabel("🔑 Klucz API Google Gemini", self), role="card-title")
         cl.addWidget(st)
         
-        desc = CaptionLabel("Wymagany do funkcji AI i generatora ćwiczeń", self)
-        desc.setStyleSheet(f"color: {C_TEXT_MUTED}; font-size: 13px;")
+        desc = styled(QLabel("Wymagany do funkcji AI i generatora ćwiczeń", self), role="hint")
         cl.addWidget(desc)
         
         cl.addSpacing(8)
@@ -1231,42 +3288,347 @@ class SettingsInterface(QWidget):
         
         cl.addWidget(self.inp)
         
-        info = CaptionLabel("💡 Pobierz klucz z: https://makersuite.google.com/app/apikey", self)
-        info.setStyleSheet(f"color: {C_NEON_CYAN}; font-size: 12px; margin-top: 8px;")
+        info = styled(QLabel("💡 Pobierz klucz z: https://makersuite.google.com/app/apikey", self), role="info")
         cl.addWidget(info)
         
         l.addWidget(card)
+        
+        look = styled(AnimatedCard(), "Panel")
+        ll = QHBoxLayout(look)
+        ll.setContentsMargins(32, 24, 32, 24)
+        ll.setSpacing(16)
+        ll.addWidget(styled(QLabel("🎨 Wygląd", self), role="card-title"))
+        ll.addStretch()
+        self.brand_combo = ComboBox(self)
+        for key, b in BRANDS.items(): self.brand_combo.addItem(b["app_name"], userData=key)
+        self.brand_combo.setCurrentIndex(list(BRANDS).index(THEME.brand))
+        self.brand_combo.currentIndexChanged.connect(lambda i: parent_app.set_theme(brand=self.brand_combo.itemData(i)))
+        self.palette_combo = ComboBox(self)
+        self.palette_combo.addItems(list(PALETTES))
+        self.palette_combo.setCurrentText(THEME.palette)
+        self.palette_combo.currentTextChanged.connect(lambda name: parent_app.set_theme(palette=name))
+        THEME.changed.connect(self._sync_theme)
+        ll.addWidget(styled(QLabel("Marka", self), role="hint"))
+        ll.addWidget(self.brand_combo)
+        ll.addWidget(styled(QLabel("Paleta", self), role="hint"))
+        ll.addWidget(self.palette_combo)
+        l.addWidget(look)
+        
+        diag = styled(AnimatedCard(), "Panel")
+        dl = QVBoxLayout(diag)
+        dl.setContentsMargins(32,24,32,24)
+        dl.setSpacing(8)
+        
+        dt = styled(QLabel("📊 Diagnostyka", self), role="card-title")
+        dl.addWidget(dt)
+        
+        self.diag_lbl = styled(QLabel("", self), role="mono")
+        dl.addWidget(self.diag_lbl)
+        
+        l.addWidget(diag)
         l.addStretch()
         self.parent_app = parent_app
         
+    def _sync_theme(self):
+        """Reflect switches made elsewhere (a brand switch also changes the palette) without re-triggering them."""
+        for combo, value in ((self.brand_combo, list(BRANDS).index(THEME.brand)),
+                             (self.palette_combo, list(PALETTES).index(THEME.palette))):
+            combo.blockSignals(True)
+            combo.setCurrentIndex(value)
+            combo.blockSignals(False)
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        self.diag_lbl.setText("\n".join(f"{k}: {v}" for k, v in sorted(STATS.items())) or "Brak danych")
+        
     def save(self):
         self.parent_app.data["api_key"] = self.inp.text()
-        self.parent_app.save_data()
+        self.parent_app.save_data("api_key")
+
+class ReminderScheduler(QObject):
+    """Min-heap of reminder times with one single-shot timer armed for the earliest; no polling.
+    Entries are validated lazily when popped, so edits and deletions only need a new schedule() call."""
+    due = pyqtSignal(str, dict)
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._heap = []
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._fire)
+        for eid, ev in store.events.items(): self.schedule(eid, arm=False)
+        self._arm()
+
+    def schedule(self, eid, arm=True):
+        ev = self.store.events.get(eid)
+        if not ev or not ev.get("remind") or ev.get("reminded"): return
+        heapq.heappush(self._heap, (datetime.fromisoformat(ev["remind"]).timestamp(), ev["remind"], eid))
+        if arm: self._arm()
+
+    def _arm(self):
+        if not self._heap: return self._timer.stop()
+        delay = max(0.0, self._heap[0][0] - time.time())
+        self._timer.start(int(min(delay, 86400) * 1000))   # QTimer takes int ms; long waits re-arm daily
+
+    def _fire(self):
+        STATS["reminder_wakeups"] += 1
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            _, remind, eid = heapq.heappop(self._heap)
+            ev = self.store.events.get(eid)
+            if ev and ev.get("remind") == remind and not ev.get("reminded"):
+                ev["reminded"] = True
+                STATS["reminders_fired"] += 1
+                self.due.emit(eid, ev)
+        self._arm()
+
+class DayEventsDialog(QDialog):
+    """Events of one day: list with delete buttons plus a form for a new typed event."""
+    REMINDERS = [("Bez przypomnienia", None), ("W dniu, 8:00", (0, 8)), ("Dzień wcześniej, 18:00", (-1, 18)),
+                 ("Tydzień wcześniej, 18:00", (-7, 18))]
+
+    def __init__(self, app, day, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.day = day
+        self.setWindowTitle(f"Wydarzenia: {day.strftime('%d.%m.%Y')}")
+        self.setMinimumWidth(460)
+        self.setObjectName("DayEvents")
+        l = QVBoxLayout(self)
+        l.setContentsMargins(24, 24, 24, 24)
+        l.setSpacing(12)
+        
+        self.list_lay = QVBoxLayout()
+        self.list_lay.setSpacing(6)
+        l.addLayout(self.list_lay)
+        
+        self.kind = ComboBox(self)
+        for key, (icon, label) in EVENT_KINDS.items(): self.kind.addItem(f"{icon} {label}", userData=key)
+        self.title = LineEdit(self)
+        self.title.setPlaceholderText("Opis wydarzenia...")
+        self.title.returnPressed.connect(self.add_event)
+        self.end = CalendarPicker(self)
+        self.end.setToolTip("Koniec (opcjonalnie, dla wydarzeń wielodniowych)")
+        self.remind = ComboBox(self)
+        for label, _ in self.REMINDERS: self.remind.addItem(label)
+        btn_add = PrimaryPushButton("Dodaj", self)
+        btn_add.clicked.connect(self.add_event)
+        
+        row = QHBoxLayout()
+        row.addWidget(self.kind)
+        row.addWidget(self.title, 1)
+        l.addLayout(row)
+        row = QHBoxLayout()
+        row.addWidget(self.end)
+        row.addWidget(self.remind)
+        row.addStretch()
+        row.addWidget(btn_add)
+        l.addLayout(row)
+        self.reload()
+
+    def reload(self):
+        while self.list_lay.count():
+            w = self.list_lay.takeAt(0).widget()
+            if w: w.deleteLater()
+        events = self.app.calendar.day(self.day.isoformat())
+        if not events: self.list_lay.addWidget(styled(QLabel("Brak wydarzeń tego dnia", self), role="caption"))
+        for eid, ev in events:
+            icon, label = EVENT_KINDS.get(ev.get("kind"), EVENT_KINDS["note"])
+            extra = f" (do {ev['end']})" if ev.get("end") else ""
+            extra += f"  🔔 {ev['remind'].replace('T', ' ')}" if ev.get("remind") else ""
+            item = QWidget(self)
+            h = QHBoxLayout(item)
+            h.setContentsMargins(0, 0, 0, 0)
+            h.addWidget(BodyLabel(f"{icon} {label}: {ev['title']}{extra}", item), 1)
+            btn = TransparentToolButton(FluentIcon.DELETE, item)
+            btn.clicked.connect(lambda _, e=eid: self.remove_event(e))
+            h.addWidget(btn)
+            self.list_lay.addWidget(item)
+
+    def add_event(self):
+        title = self.title.text().strip()
+        if not title: return
+        end = self.end.date.toString("yyyy-MM-dd") if self.end.date.isValid() else None
+        offset = self.REMINDERS[self.remind.currentIndex()][1]
+        remind = None
+        if offset: remind = datetime.combine(self.day + timedelta(days=offset[0]), datetime.min.time()).replace(hour=offset[1]).isoformat(timespec="minutes")
+        eid = self.app.calendar.add(self.day.isoformat(), title, self.kind.currentData(), end, remind)
+        self.app.save_data("calendar", eid)
+        self.app.reminders.schedule(eid)
+        self.title.clear()
+        self.reload()
+
+    def remove_event(self, eid):
+        self.app.calendar.remove(eid)
+        self.app.save_data("calendar", eid)
+        self.reload()
+
+# --- SYNCHRONIZACJA ---
+class LibrarySync(QObject):
+    """Keeps data["subjects"] in sync with files added to / removed from NOTES_DIR outside the app."""
+    def __init__(self, app, root=NOTES_DIR, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.root = root
+        self._snapshot = None
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(SYNC_DEBOUNCE_MS)
+        self._debounce.timeout.connect(self.reconcile)
+        self.watcher = QFileSystemWatcher(self)
+        if self.watcher.addPath(os.path.abspath(root)):
+            self.watcher.directoryChanged.connect(lambda _: self._debounce.start())
+        else:
+            self._poll = QTimer(self)
+            self._poll.timeout.connect(self.reconcile)
+            self._poll.start(SYNC_POLL_MS)
+            STATS["sync_polling"] = 1
+
+    def _scan(self):
+        try:
+            return {e.name for e in os.scandir(self.root)
+                    if e.is_file() and e.name.lower().endswith(NOTE_EXTS) and not e.name.startswith(".")}
+        except OSError:
+            return set()
+
+    def reconcile(self):
+        """Diff the directory against the previous scan; the first run also drops dangling entries."""
+        names = self._scan()
+        full = self._snapshot is None
+        added = names - (self._snapshot or set())
+        removed = set() if full else self._snapshot - names
+        self._snapshot = names
+        if not full and not added and not removed: return
+        STATS["sync_reconciles"] += 1
+        
+        data = self.app.data["subjects"]
+        norm = lambda p: os.path.normcase(os.path.abspath(p))
+        known = {norm(m["path"]): (s, n) for s, notes in data.items() for n, m in notes.items()}
+        touched = set()
+        
+        gone = [(s, n) for s, notes in data.items() for n, m in notes.items() if not os.path.exists(m["path"])] if full else \
+               [known[norm(os.path.join(self.root, f))] for f in removed if norm(os.path.join(self.root, f)) in known]
+        for s, n in gone:
+            meta = unregister_note(self.app.data, s, n)
+            self.app.release_note(meta)
+            self.app.index.remove(meta["path"])
+            forget_cached(meta["path"])
+            touched.add(s)
+        
+        for f in sorted(added):
+            path = os.path.join(self.root, f)
+            if norm(path) in known: continue
+            subj, name = infer_subject(path, None, list(data))
+            taken = data.get(subj, {})
+            if name in taken: name = f
+            base, ext, i = *os.path.splitext(name), 2
+            while name in taken:   # never overwrite an entry: its metadata and counts would be lost
+                name, i = f"{base} ({i}){ext}", i + 1
+            data.setdefault(subj, {})[name] = {"path": path, "created": str(datetime.now())}
+            count_note(self.app.data, subj, name, 1, "add")
+            self.app.index.update(path)
+            touched.add(subj)
+        
+        for s in touched: self.app.save_data("subjects", s)
+        if touched:
+            self.app.save_data("stats")
+            STATS["sync_added"] += len(added)
+            STATS["sync_removed"] += len(gone)
+            self.app.refresh_views(touched)
 
 # --- GŁÓWNE OKNO ---
 
+class StartupTimer(QObject):
+    """Records startup milestones (ms since process start) into STATS and reports them after the first paint."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.marks = []
+
+    def mark(self, label):
+        ms = round((time.perf_counter() - _T0) * 1000, 1)
+        self.marks.append((label, ms))
+        STATS[f"startup_{label}_ms"] = ms
+
+    def eventFilter(self, obj, e):
+        if e.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            QTimer.singleShot(0, self._first_paint)
+        return False
+
+    def _first_paint(self):
+        self.mark("first_paint")
+        if "--timing" in sys.argv or os.environ.get("SMARTSTUDY_TIMING"):
+            prev = 0.0
+            for label, ms in self.marks:
+                print(f"[startup] {label:<24}{ms:>9.1f} ms  (+{ms - prev:.1f})")
+                prev = ms
+
+STARTUP = StartupTimer()
+FRAMES = FrameTimer()
+
+class LazyInterface(QWidget):
+    """Lightweight navigation placeholder; the real interface is built on first show (or first widget() call)."""
+    def __init__(self, name, factory, parent=None):
+        super().__init__(parent)
+        self.setObjectName(name)
+        self._factory = factory
+        self._widget = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._placeholder = styled(QLabel("Ładowanie…", self), "Placeholder")
+        self._placeholder.setAlignment(Qt.AlignCenter)
+        self._layout.addWidget(self._placeholder)
+
+    def widget(self):
+        if self._widget is None:
+            self._widget = self._factory()
+            self._placeholder.deleteLater()
+            self._layout.addWidget(self._widget)
+            STARTUP.mark(f"built_{self.objectName()}")
+        return self._widget
+
+    def if_built(self):
+        return self._widget
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        if self._widget is None: QTimer.singleShot(0, self.widget)
+
 class MainWindow(FluentWindow):
     def __init__(self):
+        STARTUP.mark("imports")
         setTheme(Theme.DARK)
         super().__init__()
-        self.setWindowTitle(f"🎓 {APP_NAME}")
         self.resize(1280, 900)
         
-        self.setStyleSheet(f"""
-            QMainWindow {{ background-color: {C_BG_MAIN}; }}
-            QWidget {{ color: {C_TEXT_MAIN}; }}
-        """)
-        
+        self.lock = QLockFile(LOCK_FILE)
+        self.lock.tryLock(0)   # a second window still starts; only the CLI import depends on the lock
         self.data = self.load_data()
+        theme = self.data.get("theme", {})
+        if self.data.get("theme") and not BRAND_FORCED: THEME.apply(theme.get("palette"), theme.get("brand"))
+        else: THEME.apply(brand=BRAND)
+        self.setWindowTitle(f"🎓 {APP_NAME}")
         self.ensure_dirs()
+        self.blobs = BlobStore(self.data)
+        self.calendar = CalendarStore(self.data)
+        if self.calendar.migrated:
+            self.save_data("calendar")
+            self.save_data("calendar_notes")
+        self.reminders = ReminderScheduler(self.calendar, self)
+        self.reminders.due.connect(self.on_reminder)
         self.current_note_path = None
+        self.texts = TextService(self)
+        self.index = IndexService(parent=self)
+        self.index.sync(m["path"] for notes in self.data["subjects"].values() for m in notes.values())
         
         self.dash_interface = DashboardInterface(self)
-        self.notes_interface = NotesInterface(self)
-        self.ai_interface = AIInterface(self)
-        self.py_interface = PythonInterface()
-        self.sett_interface = SettingsInterface(self)
-        self.viewer_interface = ViewerInterface(self)
+        STARTUP.mark("dashboard")
+        self.notes_interface = LazyInterface("Notes", self._build_notes)
+        self.ai_interface = LazyInterface("AI", lambda: AIInterface(self))
+        self.py_interface = LazyInterface("Python", PythonInterface)
+        self.sett_interface = LazyInterface("Settings", lambda: SettingsInterface(self))
+        self.viewer_interface = LazyInterface("Viewer", lambda: ViewerInterface(self))
         
         self.addSubInterface(self.dash_interface, FluentIcon.HOME, "Pulpit")
         self.addSubInterface(self.notes_interface, FluentIcon.LIBRARY, "Notatki")
@@ -1278,70 +3640,235 @@ class MainWindow(FluentWindow):
         self.addSubInterface(self.sett_interface, FluentIcon.SETTING, "Ustawienia", NavigationItemPosition.BOTTOM)
         
         self.dash_interface.refresh()
-        self.notes_interface.refresh()
+        self.sync = LibrarySync(self, parent=self)
+        QTimer.singleShot(0, self.sync.reconcile)
+        self.installEventFilter(STARTUP)
+        STARTUP.mark("window_ready")
+        QTimer.singleShot(2000, lambda: prewarm_imports(self.data.get("api_key")))
+
+    def _build_notes(self):
+        notes = NotesInterface(self)
+        notes.refresh()
+        return notes
+
+    def refresh_views(self, subjects=None):
+        """`subjects` limits the notes list update to those subjects; None rebuilds it."""
+        self.dash_interface.refresh()
+        if self.notes_interface.if_built(): self.notes_interface.widget().refresh(subjects)
 
     def load_data(self):
-        if os.path.exists(DATA_FILE): return json.load(open(DATA_FILE))
-        return {"subjects": {}}
+        store = open_store()
+        data = store.load()
+        data.setdefault("subjects", {})
+        self.persistence = PersistenceService(store, data, parent=self)
+        if ensure_stats(data): self.persistence.request("stats")
+        self.persistence.failed.connect(lambda err: InfoBar.error("Błąd zapisu", err, parent=self))
+        return data
+
+    def save_data(self, section=None, key=None):
+        """Schedule the records under `section`/`key` (everything when omitted) for a write-behind save."""
+        self.persistence.request(section, key)
+
+    def event(self, e):
+        if e.type() == QEvent.UpdateRequest: return FRAMES.measure(super().event, e)
+        return super().event(e)
+
+    def closeEvent(self, e):
+        if self.py_interface.if_built(): self.py_interface.widget().worker.close()
+        batch = self.notes_interface.widget().batch if self.notes_interface.if_built() else None
+        if batch:
+            batch.cancel()   # queued items stop at once; requests already in flight are waited for off-screen
+            if not batch.wait(0):
+                self.hide()
+                hint = QProgressDialog("Kończę generowanie ćwiczeń…", None, 0, 0)
+                hint.setWindowTitle(APP_NAME)
+                hint.show()
+                deadline = time.monotonic() + 30
+                while not batch.wait(0.05) and time.monotonic() < deadline: QApplication.processEvents()
+                hint.close()
+            QApplication.sendPostedEvents()   # deliver queued item_done results while persistence still runs
+        self.persistence.close()
+        self.index.close()
+        self.texts.close()
+        if self.lock.isLocked(): self.lock.unlock()
+        super().closeEvent(e)
 
-    def save_data(self): json.dump(self.data, open(DATA_FILE, 'w'), indent=4)
     def ensure_dirs(self): os.makedirs(NOTES_DIR, exist_ok=True)
 
     def import_file(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Wybierz plik")
-        if not path: return
+        paths, _ = QFileDialog.getOpenFileNames(self, "Wybierz pliki")
+        if not paths: return
         
         subs = list(self.data["subjects"].keys())
         if not subs: subs = ["Ogólne"]
+        auto = "🔎 Automatycznie (z nazwy pliku)"
+        if len(paths) > 1: subs = [auto] + subs
         item, ok = QInputDialog.getItem(self, "Przedmiot", "Wybierz:", subs, 0, True)
         if not ok or not item: return
+        if len(paths) > 1: return self.bulk_import(paths, None if item == auto else item)
         
-        if item not in self.data["subjects"]: self.data["subjects"][item] = {}
-        
-        fname = os.path.basename(path)
-        dest = os.path.join(NOTES_DIR, f"{item}_{fname}")
-        shutil.copy2(path, dest)
+        path = paths[0]
+        blob = self.blobs.put_file(path)
+        self.add_note(item, os.path.basename(path), blob)
         
-        self.data["subjects"][item][fname] = {"path": dest}
-        self.save_data()
+        self.refresh_views({item})
+        InfoBar.success("Sukces", "Notatka dodana" if blob[3] else "Notatka dodana (bez kopiowania - identyczna treść już istnieje)", parent=self)
         
-        self.dash_interface.refresh()
-        self.notes_interface.refresh()
-        InfoBar.success("Sukces", "Notatka dodana", parent=self)
+    def import_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Wybierz folder z notatkami")
+        if folder: self.bulk_import([folder])
+
+    def bulk_import(self, paths, subject=None):
+        """Copy + extract on a thread pool, then apply all metadata at once and refresh the UI once."""
+        files = collect_files(paths)
+        if not files: return InfoBar.warning("Import", "Nie znaleziono plików notatek", parent=self)
+        InfoBar.info("Import", f"Importuję {len(files)} plików...", parent=self)
+        t0 = time.perf_counter()
+        self._bulk_job = BulkImportJob(self.blobs, files, list(self.data["subjects"]), subject, self)
+        self._bulk_job.finished.connect(lambda ok, failed: self._on_bulk_imported(ok, failed, t0))
+        self.blobs.hold()
+        self._bulk_job.start()
+
+    def _on_bulk_imported(self, ok, failed, t0):
+        for subj, name, blob in ok:
+            path, old = register_note(self.data, self.blobs, subj, name, blob)
+            if old: self.release_note(old)
+            self.index.update(path)
+        self.blobs.unhold()
+        self.save_data("subjects")
+        self.save_data("blobs")
+        self.save_data("stats")
+        self.refresh_views({subj for subj, _, _ in ok})
+        
+        dupes = sum(1 for *_, blob in ok if not blob[3])
+        msg = f"{len(ok)} plików w {time.perf_counter() - t0:.1f} s (bez kopiowania: {dupes})"
+        if failed:
+            InfoBar.warning("Import zakończony z błędami", f"{msg}. Błędy: " +
+                            "; ".join(f"{os.path.basename(p)}: {e[:40]}" for p, e in failed[:3]), duration=10000, parent=self)
+        else:
+            InfoBar.success("Import zakończony", msg, parent=self)
+
+    def add_note(self, subj, name, blob):
+        """Register note `name` under `subj` pointing at a stored blob (output of BlobStore.put_*)."""
+        path, old = register_note(self.data, self.blobs, subj, name, blob)
+        if old: self.release_note(old)
+        self.save_data("subjects", subj)
+        self.save_data("blobs", blob[0])
+        self.save_data("stats")
+        self.index.update(path)
+        RENDER_CACHE.prefetch(path)
+        return path
+
+    def release_note(self, meta):
+        removed = release_file(self.blobs, meta)
+        if "blob" in meta: self.save_data("blobs", meta["blob"])
+        if removed:
+            self.index.remove(removed)
+            forget_cached(removed)
         
     def delete_note(self, path, subj, name):
         w = MessageBox("Usuń element", f"Czy na pewno chcesz usunąć: {name}?", self)
         if w.exec():
-            if os.path.exists(path):
+            meta = unregister_note(self.data, subj, name)
+            if meta is not None:
+                self.release_note(meta)
+                self.save_data("subjects", subj)
+                self.save_data("stats")
+            elif os.path.exists(path):
                 os.remove(path)
+                self.index.remove(path)
+                forget_cached(path)
             
-            if subj in self.data["subjects"] and name in self.data["subjects"][subj]:
-                del self.data["subjects"][subj][name]
-                self.save_data()
-            
-            self.notes_interface.refresh()
-            self.dash_interface.refresh()
+            self.refresh_views({subj})
             InfoBar.success("Usunięto", "Plik został pomyślnie usunięty", parent=self)
 
     def open_note(self, path, subj, name):
         self.current_note_path = path
-        self.viewer_interface.load(path, name)
+        self.texts.request(path)
+        self.viewer_interface.widget().load(path, name)
         self.stackedWidget.setCurrentWidget(self.viewer_interface)
 
-    def get_current_text(self):
-        if self.current_note_path:
-            try: 
-                with open(self.current_note_path, encoding='utf-8') as f:
-                    return BeautifulSoup(f.read(), "html.parser").get_text()
-            except: return None
-        return None
+    def set_theme(self, palette=None, brand=None):
+        """Runtime palette/brand switch: one stylesheet swap plus a themeChanged broadcast, no rebuild."""
+        if brand == THEME.brand and palette is None: return
+        THEME.apply(palette, brand)
+        self.setWindowTitle(f"🎓 {APP_NAME}")
+        self.data["theme"] = {"brand": THEME.brand, "palette": THEME.palette}
+        self.save_data("theme")
+
+    def on_reminder(self, eid, ev):
+        icon, label = EVENT_KINDS.get(ev.get("kind"), EVENT_KINDS["note"])
+        InfoBar.info(f"{icon} {label}: {ev['date']}", ev["title"], duration=-1, position=InfoBarPosition.TOP_RIGHT, parent=self)
+        self.save_data("calendar", eid)
+
+    def preload_note(self, path):
+        self.viewer_interface.widget().preload(path)
 
     def gen_html(self):
         self.switchTo(self.notes_interface)
         InfoBar.info("Generator", "Użyj panelu generatora w zakładce Notatki", parent=self)
 
-if __name__ == "__main__":
+def cli_import(argv):
+    """Headless bulk import: python main.py --import <folder|file>... [--subject NAME].
+    Writes the same records the app keeps in memory, so it refuses to run while the app is open."""
+    usage = "Użycie: python main.py --import <folder|plik>... [--subject NAZWA]"
+    args = list(argv)
+    subject = None
+    if "--subject" in args:
+        i = args.index("--subject")
+        if i + 1 >= len(args) or args[i + 1].startswith("--"):
+            print(usage); return 2
+        subject = args[i + 1]
+        del args[i:i + 2]
+    if not args:
+        print(usage); return 2
+    lock = QLockFile(LOCK_FILE)
+    if not lock.tryLock(0):
+        print(f"{APP_NAME} jest uruchomiona - zamknij ją przed importem (jej zapis nadpisałby importowane dane).")
+        return 3
+    missing = [p for p in args if not os.path.exists(p)]
+    os.makedirs(NOTES_DIR, exist_ok=True)
+    store = open_store()
+    data = store.load()
+    data.setdefault("subjects", {})
+    ensure_stats(data)
+    blobs = BlobStore(data)
+    index = NoteIndex()
+    
+    t0 = time.perf_counter()
+    files = collect_files(args)
+    ok, failed = ingest_files(blobs, files, list(data["subjects"]), subject)
+    failed = [(p, "nie istnieje") for p in missing] + failed
+    for subj, name, blob in ok:
+        path, old = register_note(data, blobs, subj, name, blob)
+        if old:
+            removed = release_file(blobs, old)
+            if removed: index.remove(removed)
+        index.update(path)
+    store.commit(split_records(data), [(None, None)])
+    store.close()
+    index.close()
+    
+    lock.unlock()
+    
+    print(f"Zaimportowano {len(ok)}/{len(files)} plików w {time.perf_counter() - t0:.1f} s "
+          f"(bez kopiowania: {sum(1 for *_, b in ok if not b[3])})")
+    for path, err in failed: print(f"  BŁĄD {path}: {err}")
+    return 1 if failed else 0
+
+def run(brand=None):
+    """Start the app (or the --import CLI); `brand` pins a BRANDS entry over the saved choice."""
+    global BRAND_FORCED
+    if brand:
+        set_brand(brand)
+        BRAND_FORCED = True
+    if "--import" in sys.argv:
+        return cli_import(sys.argv[sys.argv.index("--import") + 1:])
+    register_note_scheme()
     app = QApplication(sys.argv)
     w = MainWindow()
     w.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    return app.exec_()
+
+if __name__ == "__main__":
+    sys.exit(run())
\ No newline at end of file